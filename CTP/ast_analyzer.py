@@ -0,0 +1,202 @@
+# ast_analyzer.py
+import ast
+import re
+from typing import Dict, List, Optional, Tuple
+
+# Bump whenever a rule below changes so cached results are invalidated
+RULES_VERSION = 2
+
+# Findings reuse the VULNERABILITY_PATTERNS names so reports and severities line up
+SEVERITY = {
+    "SQL_INJECTION": "CRITICAL",
+    "CROSS_SITE_SCRIPTING": "HIGH",
+    "INSECURE_DB_ACCESS": "HIGH",
+    "HARDCODED_CREDENTIALS": "MEDIUM",
+}
+
+SQL_RE = re.compile(r"\b(select\s.*\bfrom|insert\s+into|update\s.*\bset|delete\s+from|where\s)", re.IGNORECASE | re.DOTALL)
+SECRET_NAME_RE = re.compile(r"(^|_)(secret|password|passwd|pwd|token|api_?key|private_?key|access_?key)(_|$)")
+EXECUTE_METHODS = {"execute", "executemany", "executescript", "raw", "extra"}
+XSS_SINKS = {"mark_safe", "Markup", "render_template_string"}
+WRITE_OBJECTS = {"response", "resp", "document"}
+# Cheap byte-level test run before parsing: a file none of the rules could fire on is not parsed at all
+TRIGGER_RE = re.compile(rb"execute|\.raw\s*\(|\.extra\s*\(|write\s*\(|mark_safe|markup|render_template_string|check_same_thread"
+                        rb"|secret|passw|pwd|token|api_?key|private_?key|access_?key|'root'|\"root\"")
+# Nodes that can never contain anything a rule looks at
+LEAF_NODES = (ast.expr_context, ast.Constant, ast.operator, ast.cmpop, ast.boolop, ast.unaryop)
+
+def _is_str(node: ast.AST) -> bool:
+    return isinstance(node, ast.Constant) and isinstance(node.value, str)
+
+def _secret_name(name: str) -> bool:
+    return bool(SECRET_NAME_RE.search(name.lower()))
+
+def _target_name(node: ast.AST) -> Optional[str]:
+    """Name being assigned to: x, obj.x or obj['x']."""
+    if isinstance(node, ast.Name):
+        return node.id
+    if isinstance(node, ast.Attribute):
+        return node.attr
+    if isinstance(node, ast.Subscript) and _is_str(node.slice):
+        return node.slice.value
+    return None
+
+def _concat_parts(node: ast.AST) -> List[ast.AST]:
+    """Flattens a chain of + into its operands."""
+    if isinstance(node, ast.BinOp) and isinstance(node.op, ast.Add):
+        return _concat_parts(node.left) + _concat_parts(node.right)
+    if isinstance(node, ast.JoinedStr):
+        return [v.value if isinstance(v, ast.FormattedValue) else v for v in node.values]
+    return [node]
+
+class PythonAnalyzer(ast.NodeVisitor):
+    """Evaluates every rule in one walk over a module's AST.
+
+    SQL text is tracked through assignments per function scope, so a query
+    built over several statements and then passed to execute() is caught,
+    while SQL that only appears in comments or constant strings is not.
+    """
+
+    _handlers: Dict[type, Optional[object]] = {}
+
+    def __init__(self, lines: List[str]):
+        self.lines = lines
+        self.findings: Dict[str, List[Tuple[int, str]]] = {}
+        self.seen = set()
+        # name -> True for dynamically built SQL, False for constant SQL
+        self.scopes: List[Dict[str, bool]] = [{}]
+
+    def report(self, vuln_name: str, node: ast.AST):
+        line_num = node.lineno
+        if (vuln_name, line_num) in self.seen:
+            return
+        self.seen.add((vuln_name, line_num))
+        snippet = self.lines[line_num - 1].strip() if line_num <= len(self.lines) else ""
+        self.findings.setdefault(vuln_name, []).append((line_num, snippet))
+
+    def visit(self, node):
+        # Same dispatch as NodeVisitor.visit, with the handler lookup cached per node type
+        cls = node.__class__
+        try:
+            method = self._handlers[cls]
+        except KeyError:
+            method = self._handlers[cls] = getattr(type(self), "visit_" + cls.__name__, None)
+        if method is None:
+            self.generic_visit(node)
+        else:
+            method(self, node)
+
+    def generic_visit(self, node):
+        for field in node._fields:
+            value = getattr(node, field, None)
+            if isinstance(value, list):
+                for item in value:
+                    if isinstance(item, ast.AST) and not isinstance(item, LEAF_NODES):
+                        self.visit(item)
+            elif isinstance(value, ast.AST) and not isinstance(value, LEAF_NODES):
+                self.visit(value)
+
+    def lookup(self, name: str) -> Optional[bool]:
+        for scope in reversed(self.scopes):
+            if name in scope:
+                return scope[name]
+        return None
+
+    def sql_state(self, node: ast.AST) -> Optional[bool]:
+        """None if node is not SQL text, False for constant SQL, True for SQL built from variables."""
+        if isinstance(node, ast.Name):
+            return self.lookup(node.id)
+        if isinstance(node, ast.BinOp) and isinstance(node.op, ast.Mod):
+            return True if self.sql_state(node.left) is not None else None
+        if (isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute)
+                and node.func.attr == "format"):
+            return True if self.sql_state(node.func.value) is not None else None
+        if not (_is_str(node) or isinstance(node, (ast.BinOp, ast.JoinedStr))):
+            return None
+
+        parts = _concat_parts(node)
+        text = "".join(p.value for p in parts if _is_str(p))
+        states = [self.lookup(p.id) for p in parts if isinstance(p, ast.Name)]
+        if not SQL_RE.search(text) and all(s is None for s in states):
+            return None
+        return any(s is not False for s in states) or any(
+            not _is_str(p) and not isinstance(p, ast.Name) for p in parts)
+
+    def visit_FunctionDef(self, node):
+        self.scopes.append({})
+        self.generic_visit(node)
+        self.scopes.pop()
+
+    visit_AsyncFunctionDef = visit_FunctionDef
+    visit_Lambda = visit_FunctionDef
+
+    def assign(self, target: ast.AST, value: ast.AST, node: ast.AST):
+        name = _target_name(target)
+        if name and _is_str(value) and value.value and _secret_name(name):
+            self.report("HARDCODED_CREDENTIALS", node)
+        if isinstance(target, ast.Name):
+            state = self.sql_state(value)
+            if state is None:
+                self.scopes[-1].pop(target.id, None)
+            else:
+                self.scopes[-1][target.id] = state
+
+    def visit_Assign(self, node):
+        self.generic_visit(node)
+        for target in node.targets:
+            self.assign(target, node.value, node)
+
+    def visit_AnnAssign(self, node):
+        self.generic_visit(node)
+        if node.value is not None:
+            self.assign(node.target, node.value, node)
+
+    def visit_AugAssign(self, node):
+        self.generic_visit(node)
+        if isinstance(node.target, ast.Name) and isinstance(node.op, ast.Add):
+            combined = ast.BinOp(left=ast.Name(id=node.target.id, ctx=ast.Load()), op=ast.Add(), right=node.value)
+            self.assign(node.target, combined, node)
+
+    def visit_Dict(self, node):
+        self.generic_visit(node)
+        for key, value in zip(node.keys, node.values):
+            if key is not None and _is_str(key) and _is_str(value) and value.value and _secret_name(key.value):
+                self.report("HARDCODED_CREDENTIALS", value)
+
+    def visit_Call(self, node):
+        self.generic_visit(node)
+        func = node.func
+        name = func.attr if isinstance(func, ast.Attribute) else getattr(func, "id", None)
+
+        if name in EXECUTE_METHODS and node.args and self.sql_state(node.args[0]):
+            self.report("SQL_INJECTION", node)
+
+        first_dynamic = bool(node.args) and not _is_str(node.args[0])
+        if name in XSS_SINKS and first_dynamic:
+            self.report("CROSS_SITE_SCRIPTING", node)
+        elif (name == "write" and isinstance(func, ast.Attribute) and isinstance(func.value, ast.Name)
+              and func.value.id in WRITE_OBJECTS and first_dynamic):
+            self.report("CROSS_SITE_SCRIPTING", node)
+
+        for keyword in node.keywords:
+            value = keyword.value
+            if keyword.arg == "check_same_thread" and isinstance(value, ast.Constant) and value.value is False:
+                self.report("INSECURE_DB_ACCESS", node)
+            elif keyword.arg in ("user", "username") and _is_str(value) and value.value == "root":
+                self.report("INSECURE_DB_ACCESS", node)
+            elif keyword.arg and _secret_name(keyword.arg) and _is_str(value) and value.value:
+                self.report("HARDCODED_CREDENTIALS", node)
+
+def analyze_source(source: bytes) -> Dict[str, List[Tuple[int, str]]]:
+    """Parses Python source once and returns {vulnerability: [(line, snippet)]}.
+
+    Raises SyntaxError (or ValueError) for input that is not valid Python.
+    """
+    if not TRIGGER_RE.search(source.lower()):
+        return {}
+    tree = ast.parse(source)
+    analyzer = PythonAnalyzer(source.decode("utf-8", errors="replace").splitlines())
+    analyzer.visit(tree)
+    for hits in analyzer.findings.values():
+        hits.sort()
+    return analyzer.findings
\ No newline at end of file
@@ -0,0 +1,186 @@
+# benchmark_scanner.py
+import argparse
+import json
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+from vulnerability_scanner import AIScanner, PatternMatcher, VULNERABILITY_PATTERNS
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Statements at function-body indentation; every one is valid Python so the AST mode can parse the corpus
+FILLER_LINES = [
+    "    total = sum(item.count for item in items)",
+    "    name = record.get('name', '')",
+    "    logger.debug('processed %s', name)",
+    "    result.append(total * 2)",
+    "    # TODO: tidy this up before release",
+    "    values = [value.strip() for value in name.split(',') if value]",
+    "    limit = max(limit, len(values))",
+    # A bare write() is no XSS sink, and must not trip up the AST mode's method checks
+    "    write(name)",
+]
+# One finding per rule, caught by both the keyword and the AST mode
+VULNERABLE_LINES = [
+    "    cur.execute('SELECT * FROM users WHERE id = ' + user_id)",
+    "    response.write(user_input)",
+    "    conn = sqlite3.connect(path, check_same_thread=False)",
+    "    SECRET_KEY = 'hardcoded-value'",
+    "    db.connect(user='root', password='password')",
+]
+FUNCTION_BODY_LINES = 20
+# Lines held in memory for the in-process and per-rule measurements
+SAMPLE_LINES = 200_000
+
+def generate_corpus(directory: str, files: int, lines_per_file: int, density: float, seed: int = 1) -> int:
+    """Writes a synthetic Python source tree; density is the share of vulnerable lines. Returns the line count."""
+    rng = random.Random(seed)
+    total = 0
+    for n in range(files):
+        subdir = os.path.join(directory, f"pkg{n % 16:02d}")
+        os.makedirs(subdir, exist_ok=True)
+        with open(os.path.join(subdir, f"module_{n:05d}.py"), "w") as f:
+            written = 0
+            while written < lines_per_file:
+                f.write(f"def func_{written}(items, record, user_id, user_input, path, limit, result):\n")
+                for _ in range(FUNCTION_BODY_LINES):
+                    pool = VULNERABLE_LINES if rng.random() < density else FILLER_LINES
+                    f.write(rng.choice(pool) + "\n")
+                f.write("    return result\n\n")
+                written += FUNCTION_BODY_LINES + 3
+        total += written
+    return total
+
+def read_sample(directory: str, limit: int = SAMPLE_LINES) -> List[str]:
+    lines = []
+    for dirpath, _, filenames in os.walk(directory):
+        for filename in sorted(filenames):
+            with open(os.path.join(dirpath, filename)) as f:
+                for line in f:
+                    lines.append(line)
+                    if len(lines) >= limit:
+                        return lines
+    return lines
+
+def peak_rss_mb() -> Optional[Dict[str, float]]:
+    """Peak resident set size of this process and of its (reaped) workers."""
+    if resource is None:
+        return None
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return {"self": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale,
+            "workers": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / scale}
+
+def bench_in_memory(lines: List[str], patterns: Dict[str, Dict]) -> Dict[str, float]:
+    scanner = AIScanner(patterns)
+    start = time.perf_counter()
+    report = scanner.scan_code(lines)
+    elapsed = time.perf_counter() - start
+    return {"lines": len(lines), "seconds": elapsed, "lines_per_sec": len(lines) / elapsed,
+            "findings": sum(len(hits) for hits in report.values())}
+
+def bench_tree(directory: str, total_lines: int, patterns: Dict[str, Dict], mode: str,
+               workers: Optional[int], cache_path: Optional[str] = None) -> Dict[str, float]:
+    scanner = AIScanner(patterns, mode=mode)
+    start = time.perf_counter()
+    findings = sum(len(hits) for _, report in scanner.scan_tree(directory, workers, cache_path=cache_path)
+                   for hits in report.values())
+    elapsed = time.perf_counter() - start
+    return {"lines": total_lines, "seconds": elapsed, "lines_per_sec": total_lines / elapsed,
+            "findings": findings}
+
+def bench_rules(lines: List[str], patterns: Dict[str, Dict], repeat: int = 3) -> Dict[str, Dict[str, float]]:
+    """Cost of each rule on its own, in nanoseconds per line (best of repeat runs)."""
+    costs = {}
+    for name, details in patterns.items():
+        matcher = PatternMatcher({name: details})
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            hits = sum(1 for line in lines if matcher.match(line))
+            best = min(best, time.perf_counter() - start)
+        costs[name] = {"ns_per_line": best / len(lines) * 1e9, "hits": hits}
+    return costs
+
+def run_benchmarks(args) -> Dict:
+    corpus = args.corpus or tempfile.mkdtemp(prefix="ctp_corpus_")
+    try:
+        print(f"## Generating {args.files} files x {args.lines} lines (density {args.density}) in {corpus}")
+        total_lines = generate_corpus(corpus, args.files, args.lines, args.density, args.seed)
+        sample = read_sample(corpus)
+        patterns = VULNERABILITY_PATTERNS
+
+        results = {"corpus": {"files": args.files, "lines": total_lines, "density": args.density},
+                   "in_memory": bench_in_memory(sample, patterns)}
+        for mode in ("keyword", "ast"):
+            results[f"tree_{mode}"] = bench_tree(corpus, total_lines, patterns, mode, args.workers)
+
+        cache_path = os.path.join(tempfile.mkdtemp(prefix="ctp_cache_"), "cache.sqlite")
+        try:
+            bench_tree(corpus, total_lines, patterns, "keyword", args.workers, cache_path)
+            results["tree_cached_rescan"] = bench_tree(corpus, total_lines, patterns, "keyword",
+                                                       args.workers, cache_path)
+        finally:
+            shutil.rmtree(os.path.dirname(cache_path), ignore_errors=True)
+
+        results["rules"] = bench_rules(sample, patterns)
+        results["peak_rss_mb"] = peak_rss_mb()
+        return results
+    finally:
+        if not args.corpus:
+            shutil.rmtree(corpus, ignore_errors=True)
+
+def slow_rules(rules: Dict[str, Dict[str, float]], max_ratio: float) -> List[str]:
+    """Rules costing more than max_ratio times the median rule."""
+    median = statistics.median(rule["ns_per_line"] for rule in rules.values())
+    return [name for name, rule in rules.items() if rule["ns_per_line"] > median * max_ratio]
+
+def print_report(results: Dict, slow: List[str]):
+    print("\n### THROUGHPUT ###")
+    for key in ("in_memory", "tree_keyword", "tree_ast", "tree_cached_rescan"):
+        run = results[key]
+        print(f"   {key:<20} {run['lines_per_sec']:>14,.0f} lines/s  {run['seconds']:8.3f}s  "
+              f"{run['findings']:>8} findings")
+
+    print("\n### PER-RULE COST ###")
+    for name, rule in sorted(results["rules"].items(), key=lambda item: -item[1]["ns_per_line"]):
+        flag = "🚨 SLOW" if name in slow else "✅"
+        print(f"   {flag} {name:<24} {rule['ns_per_line']:8.1f} ns/line  {rule['hits']:>8} hits")
+
+    rss = results["peak_rss_mb"]
+    if rss:
+        print(f"\n### PEAK RSS ###\n   scanner {rss['self']:.1f} MB, largest worker {rss['workers']:.1f} MB")
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description='Benchmark AIScanner on a synthetic source corpus.')
+    parser.add_argument('--files', type=int, default=200, help='Files to generate (default: 200)')
+    parser.add_argument('--lines', type=int, default=1000, help='Lines per file (default: 1000)')
+    parser.add_argument('--density', type=float, default=0.01,
+                        help='Share of lines that contain a vulnerability (default: 0.01)')
+    parser.add_argument('--seed', type=int, default=1, help='Corpus random seed (default: 1)')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Worker processes for the tree scans (default: one per CPU)')
+    parser.add_argument('--corpus', metavar='DIR', help='Generate the corpus here and keep it')
+    parser.add_argument('--json', metavar='FILE', help='Also write the raw results as JSON')
+    parser.add_argument('--max-rule-ratio', type=float, default=3.0,
+                        help='Fail if a rule costs more than this multiple of the median rule (default: 3.0)')
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    args = parse_arguments()
+    results = run_benchmarks(args)
+    slow = slow_rules(results["rules"], args.max_rule_ratio)
+    print_report(results, slow)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    sys.exit(1 if slow else 0)
\ No newline at end of file
@@ -40,7 +40,11 @@ def main():
 
         if choice == '1':
             print("\n--- RUNNING MODULE 1: AI VULNERABILITY SCANNER ---")
-            scanner.run_scan(CODE_TO_SCAN)
+            target = input("Directory to scan (leave blank for the built-in sample): ").strip()
+            if target:
+                scanner.run_tree_scan(target)
+            else:
+                scanner.run_scan(CODE_TO_SCAN)
         
         elif choice == '2':
             print("\n--- RUNNING MODULE 2: RANSOMWARE LAB SIMULATION ---")
@@ -0,0 +1,114 @@
+# scan_cache.py
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from typing import Dict, List, Optional, Tuple
+
+# Bump whenever the scanner itself changes in a way that alters findings for the same rules
+SCANNER_VERSION = 1
+HASH_BLOCK = 1 << 20
+# Writes are committed in batches rather than per file
+COMMIT_EVERY = 500
+# Results of a ruleset (patterns + scan mode) not opened for this long are pruned
+RULESET_TTL = 30 * 86400
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path     TEXT PRIMARY KEY,
+    size     INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    digest   TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS results (
+    digest   TEXT NOT NULL,
+    ruleset  TEXT NOT NULL,
+    findings TEXT NOT NULL,
+    PRIMARY KEY (digest, ruleset)
+);
+CREATE TABLE IF NOT EXISTS rulesets (
+    ruleset   TEXT PRIMARY KEY,
+    last_used REAL NOT NULL
+);
+"""
+
+Findings = Dict[str, List[Tuple[int, str]]]
+
+def ruleset_hash(patterns: Dict[str, Dict], variant: str = "") -> str:
+    """Fingerprint of the rules in force; any change to the patterns (or scan mode) changes it."""
+    blob = json.dumps([SCANNER_VERSION, variant, patterns], sort_keys=True)
+    return hashlib.sha256(blob.encode()).hexdigest()
+
+def file_digest(path: str) -> str:
+    """SHA-256 of a file's content, read block by block."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+class ScanCache:
+    """Per-file findings keyed by content hash and ruleset hash.
+
+    A (path, size, mtime) index avoids rehashing untouched files; a file
+    whose stat changed but whose content did not (checkout, touch) still
+    hits on its digest. Results are kept per ruleset, so editing
+    VULNERABILITY_PATTERNS invalidates everything automatically while
+    switching between scan modes keeps each mode's results; a ruleset
+    not opened for writing within RULESET_TTL is pruned. Worker processes
+    open the cache read-only and leave all writes to the parent.
+    """
+
+    def __init__(self, path: str, patterns: Dict[str, Dict], readonly: bool = False, variant: str = ""):
+        self.ruleset = ruleset_hash(patterns, variant)
+        self.readonly = readonly
+        self._pending = 0
+        if readonly:
+            self._db = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+            return
+        self._db = sqlite3.connect(path)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(SCHEMA)
+        now = time.time()
+        self._db.execute("INSERT OR REPLACE INTO rulesets VALUES (?, ?)", (self.ruleset, now))
+        self._db.execute("DELETE FROM rulesets WHERE last_used < ?", (now - RULESET_TTL,))
+        self._db.execute("DELETE FROM results WHERE ruleset NOT IN (SELECT ruleset FROM rulesets)")
+        self._db.commit()
+
+    def close(self):
+        if not self.readonly:
+            self._db.commit()
+        self._db.close()
+
+    def lookup(self, path: str) -> Tuple[Optional[Findings], Optional[Tuple[int, int, str]]]:
+        """Returns (findings or None, entry) for a file.
+
+        entry is the (size, mtime_ns, digest) the parent should record, or
+        None when the stat index already matched and nothing needs writing.
+        """
+        path = os.path.abspath(path)
+        st = os.stat(path)
+        row = self._db.execute("SELECT size, mtime_ns, digest FROM files WHERE path = ?", (path,)).fetchone()
+        if row and row[0] == st.st_size and row[1] == st.st_mtime_ns:
+            digest, entry = row[2], None
+        else:
+            digest = file_digest(path)
+            entry = (st.st_size, st.st_mtime_ns, digest)
+        found = self._db.execute("SELECT findings FROM results WHERE digest = ? AND ruleset = ?",
+                                 (digest, self.ruleset)).fetchone()
+        if found is None:
+            return None, entry or (st.st_size, st.st_mtime_ns, digest)
+        findings = {name: [tuple(hit) for hit in hits] for name, hits in json.loads(found[0]).items()}
+        return findings, entry
+
+    def put(self, path: str, entry: Tuple[int, int, str], findings: Findings):
+        size, mtime_ns, digest = entry
+        self._db.execute("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?)",
+                         (os.path.abspath(path), size, mtime_ns, digest))
+        self._db.execute("INSERT OR REPLACE INTO results VALUES (?, ?, ?)",
+                         (digest, self.ruleset, json.dumps(findings)))
+        self._pending += 1
+        if self._pending >= COMMIT_EVERY:
+            self._db.commit()
+            self._pending = 0
\ No newline at end of file
@@ -1,6 +1,13 @@
 # vulnerability_scanner.py
+import argparse
+import os
+import re
+import sys
 import time
-from typing import List, Dict, Tuple
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from typing import List, Dict, Tuple, Iterator, Optional, Union
+from scan_cache import ScanCache
+import ast_analyzer
 
 VULNERABILITY_PATTERNS = {
     "SQL_INJECTION": {"severity": "CRITICAL", "keywords": ["SELECT * FROM", "WHERE id =", "'+ user_input +'", "' + request.form"]},
@@ -9,25 +16,203 @@ VULNERABILITY_PATTERNS = {
     "HARDCODED_CREDENTIALS": {"severity": "MEDIUM", "keywords": ["api_key = \"", "SECRET_KEY ="]}
 }
 
+class PatternMatcher:
+    """Compiles every pattern's keywords once into precompiled regexes.
+
+    Keywords are lowercased at compile time and each line is lowercased once.
+    A single alternation over all keywords rejects the (vast majority of)
+    clean lines in one C-level search; only lines that hit are checked
+    against each pattern's own compiled alternation.
+    """
+
+    def __init__(self, patterns: Dict[str, Dict]):
+        keywords = {name: sorted({k.lower() for k in data["keywords"]}, key=len, reverse=True)
+                    for name, data in patterns.items()}
+        self._rules = [(name, re.compile("|".join(map(re.escape, words))))
+                       for name, words in keywords.items() if words]
+        every = sorted({k for words in keywords.values() for k in words}, key=len, reverse=True)
+        self._any = re.compile("|".join(map(re.escape, every))) if every else None
+
+    def match(self, line: str) -> List[str]:
+        """Returns the names of every pattern with a keyword in the line."""
+        if self._any is None:
+            return []
+        line = line.lower()
+        if not self._any.search(line):
+            return []
+        return [name for name, rule in self._rules if rule.search(line)]
+
+# Directories that hold third-party or generated code rather than the project's own
+SKIP_DIRS = {".git", ".hg", ".svn", "node_modules", "vendor", "third_party", "site-packages",
+             "__pycache__", ".venv", "venv", ".tox", "dist", "build"}
+BINARY_SNIFF_BYTES = 8192
+# Files handed to a worker process per task
+FILES_PER_CHUNK = 64
+# "keyword" matches VULNERABILITY_PATTERNS line by line; "ast" parses Python files instead
+SCAN_MODES = ("keyword", "ast")
+
+def is_binary(path: str) -> bool:
+    """Treats a file as binary if its first block contains a NUL byte."""
+    with open(path, "rb") as f:
+        return b"\0" in f.read(BINARY_SNIFF_BYTES)
+
+def iter_source_files(root: str, skip_dirs=SKIP_DIRS) -> Iterator[str]:
+    """Lazily yields every text file under root, pruning vendored directories."""
+    if os.path.isfile(root):
+        yield root
+        return
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if d not in skip_dirs)
+        for filename in sorted(filenames):
+            path = os.path.join(dirpath, filename)
+            try:
+                if os.path.isfile(path) and not is_binary(path):
+                    yield path
+            except OSError:
+                continue
+
+def scan_file(path: str, matcher: PatternMatcher, mode: str = "keyword") -> Dict[str, List[Tuple[int, str]]]:
+    """Scans one file line by line; only the read buffer is ever held in memory.
+
+    In "ast" mode Python files are parsed and analysed instead; anything that
+    does not parse falls back to keyword matching.
+    """
+    if mode == "ast" and path.endswith(".py"):
+        with open(path, "rb") as f:
+            source = f.read()
+        try:
+            return ast_analyzer.analyze_source(source)
+        except (SyntaxError, ValueError):
+            pass
+    findings = {}
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        for line_num, line in enumerate(f, 1):
+            for vuln_name in matcher.match(line):
+                findings.setdefault(vuln_name, []).append((line_num, line.strip()))
+    return findings
+
+# Each worker process compiles the patterns (and opens the cache) once and keeps them here
+_worker_matcher: Optional[PatternMatcher] = None
+_worker_cache: Optional[ScanCache] = None
+_worker_mode = "keyword"
+
+def _cache_variant(mode: str) -> str:
+    return f"ast-{ast_analyzer.RULES_VERSION}" if mode == "ast" else mode
+
+def _init_worker(patterns: Dict[str, Dict], cache_path: Optional[str] = None, mode: str = "keyword"):
+    global _worker_matcher, _worker_cache, _worker_mode
+    _worker_matcher = PatternMatcher(patterns)
+    _worker_mode = mode
+    if cache_path:
+        _worker_cache = ScanCache(cache_path, patterns, readonly=True, variant=_cache_variant(mode))
+
+def _scan_chunk(paths: List[str]) -> List[Tuple[str, Dict[str, List[Tuple[int, str]]], Optional[Tuple]]]:
+    """Scans a chunk, returning (path, findings, cache entry to record or None) per file."""
+    results = []
+    for path in paths:
+        try:
+            findings, entry = _worker_cache.lookup(path) if _worker_cache else (None, None)
+            if findings is None:
+                findings = scan_file(path, _worker_matcher, _worker_mode)
+            results.append((path, findings, entry))
+        except OSError:
+            continue
+    return results
+
+def _chunks(paths: Iterator[str], size: int) -> Iterator[List[str]]:
+    chunk = []
+    for path in paths:
+        chunk.append(path)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
 class AIScanner:
     """Module for ethical vulnerability scanning."""
     
-    def __init__(self, patterns=VULNERABILITY_PATTERNS):
+    def __init__(self, patterns=VULNERABILITY_PATTERNS, mode: str = "keyword"):
+        if mode not in SCAN_MODES:
+            raise ValueError(f"mode must be one of {SCAN_MODES}")
         self.patterns = patterns
+        self.mode = mode
+        self.matcher = PatternMatcher(patterns)
+        self.severities = {**ast_analyzer.SEVERITY,
+                           **{name: details["severity"] for name, details in patterns.items()}}
 
     def scan_code(self, code_base: List[str]) -> Dict[str, List[Tuple[int, str]]]:
         """Scans code for defined patterns."""
         vulnerability_report = {name: [] for name in self.patterns.keys()}
         
         for line_num, line in enumerate(code_base, 1):
-            line_lower = line.lower()
-            
-            for vuln_name, details in self.patterns.items():
-                if any(k.lower() in line_lower for k in details["keywords"]):
-                    vulnerability_report[vuln_name].append((line_num, line.strip()))
+            for vuln_name in self.matcher.match(line):
+                vulnerability_report[vuln_name].append((line_num, line.strip()))
                     
         return vulnerability_report
 
+    def scan_tree(self, root: Union[str, List[str]], workers: Optional[int] = None, chunk_size: int = FILES_PER_CHUNK,
+                  cache_path: Optional[str] = None) -> Iterator[Tuple[str, Dict[str, List[Tuple[int, str]]]]]:
+        """Scans every source file under root in a process pool.
+
+        root may be one path or a list of them. Yields (path, findings) per
+        file as chunks complete; findings maps a
+        vulnerability name to its (line, snippet) hits. Only a bounded number
+        of chunks is queued at once, so the walk itself stays lazy too. With
+        cache_path, files whose content was already scanned under the same
+        rules are answered from the cache instead of being re-analysed.
+        """
+        workers = workers or os.cpu_count() or 1
+        cache = ScanCache(cache_path, self.patterns, variant=_cache_variant(self.mode)) if cache_path else None
+        roots = [root] if isinstance(root, str) else root
+        paths = (path for each in roots for path in iter_source_files(each))
+        chunks = _chunks(paths, chunk_size)
+
+        def results(future):
+            for path, findings, entry in future.result():
+                if cache and entry:
+                    cache.put(path, entry, findings)
+                yield path, findings
+
+        try:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(self.patterns, cache_path, self.mode)) as pool:
+                pending = set()
+                for chunk in chunks:
+                    pending.add(pool.submit(_scan_chunk, chunk))
+                    if len(pending) < workers * 2:
+                        continue
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield from results(future)
+                for future in pending:
+                    yield from results(future)
+        finally:
+            if cache:
+                cache.close()
+
+    def run_tree_scan(self, root: Union[str, List[str]], workers: Optional[int] = None,
+                      cache_path: Optional[str] = None) -> int:
+        """Scans a source tree, prints findings per file and line and returns the finding count."""
+        start_time = time.time()
+        files = flagged = total = 0
+        for path, findings in self.scan_tree(root, workers, cache_path=cache_path):
+            files += 1
+            if not findings:
+                continue
+            flagged += 1
+            print(f"\n📄 {path}")
+            for vuln_name, hits in findings.items():
+                severity = self.severities[vuln_name]
+                for line_num, snippet in hits:
+                    total += 1
+                    print(f"   🚨 {severity} {vuln_name} line {line_num}: `{snippet}`")
+        end_time = time.time()
+
+        print(f"\n## ✅ Scanned {files} files in {round(end_time - start_time, 2)} seconds: "
+              f"{total} findings in {flagged} files.")
+        return total
+
     def run_scan(self, code_base: List[str]):
         """Executes the scan and prints a user-friendly report."""
         start_time = time.time()
@@ -44,4 +229,22 @@ class AIScanner:
                 for line_num, snippet in findings:
                     print(f"   Line {line_num}: `{snippet}`")
             else:
-                print(f"✅ {vuln_name}: Clean.")
\ No newline at end of file
+                print(f"✅ {vuln_name}: Clean.")
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description='Scan a source tree for vulnerability patterns.')
+    parser.add_argument('paths', nargs='+', help='Files or directories to scan')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Worker processes (default: one per CPU)')
+    parser.add_argument('--cache', metavar='FILE',
+                        help='SQLite cache of per-file findings; unchanged files are not re-scanned')
+    parser.add_argument('--mode', choices=SCAN_MODES, default='keyword',
+                        help='keyword: substring patterns on every line; ast: parse Python files and '
+                             'follow SQL through assignments (default: keyword)')
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    args = parse_arguments()
+    findings = AIScanner(mode=args.mode).run_tree_scan(args.paths, args.workers, args.cache)
+    # Non-zero exit lets the scanner gate a pre-commit hook
+    sys.exit(1 if findings else 0)
\ No newline at end of file
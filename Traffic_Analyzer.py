@@ -3,13 +3,164 @@
 import platform
 import subprocess
 import socket
+import struct
+import os
 import re
 import json
+import errno
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
+# Linux fast path: the kernel's own tables, read directly instead of spawning ip/arp
+SYS_CLASS_NET = "/sys/class/net"
+PROC_NET_ARP = "/proc/net/arp"
+PROC_NET_IF_INET6 = "/proc/net/if_inet6"
+ARPHRD_ETHER = 1
+ATF_COM = 0x02  # ARP entry is complete (has a MAC)
+
+# rtnetlink (linux/netlink.h, linux/rtnetlink.h)
+NLMSG_ERROR, NLMSG_DONE = 2, 3
+RTM_NEWADDR, RTM_DELADDR, RTM_GETADDR = 20, 21, 22
+RTM_NEWNEIGH, RTM_DELNEIGH = 28, 29
+NLM_F_REQUEST, NLM_F_DUMP = 0x1, 0x300
+RTMGRP_NEIGH, RTMGRP_IPV4_IFADDR = 0x4, 0x10
+IFA_ADDRESS, IFA_LOCAL = 1, 2
+NDA_DST, NDA_LLADDR = 1, 2
+NUD_INCOMPLETE, NUD_FAILED = 0x01, 0x20
+NLMSG_HEADER = struct.Struct("=IHHII")  # length, type, flags, sequence, port id
+IFADDRMSG = struct.Struct("=BBBBI")     # family, prefix length, flags, scope, interface index
+NDMSG = struct.Struct("=BBHiHBB")       # family, padding, padding, interface index, state, flags, type
+RTATTR = struct.Struct("=HH")           # length, type
+NETLINK_BUFFER = 65536
+# Kernel-side queue for monitoring events; if it still overflows the table is re-read
+NETLINK_EVENT_BUFFER = 1 << 20
+
+def _align4(length):
+    return (length + 3) & ~3
+
+def iter_netlink_messages(data):
+    """Yield (type, payload) for each message in a netlink datagram"""
+    offset = 0
+    while offset + NLMSG_HEADER.size <= len(data):
+        length, kind = NLMSG_HEADER.unpack_from(data, offset)[:2]
+        if length < NLMSG_HEADER.size:
+            break
+        yield kind, data[offset + NLMSG_HEADER.size:offset + length]
+        offset += _align4(length)
+
+def parse_rtattrs(payload, offset):
+    """{attribute type: value} for the route attributes following a fixed header"""
+    attrs = {}
+    while offset + RTATTR.size <= len(payload):
+        length, kind = RTATTR.unpack_from(payload, offset)
+        if length < RTATTR.size:
+            break
+        attrs[kind] = payload[offset + RTATTR.size:offset + length]
+        offset += _align4(length)
+    return attrs
+
+def netlink_dump(request_type, header):
+    """Send one rtnetlink dump request and return the (type, payload) of every reply"""
+    with socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, socket.NETLINK_ROUTE) as sock:
+        sock.bind((0, 0))
+        request = NLMSG_HEADER.pack(NLMSG_HEADER.size + len(header), request_type,
+                                    NLM_F_REQUEST | NLM_F_DUMP, 1, 0) + header
+        sock.send(request)
+        replies = []
+        while True:
+            for kind, payload in iter_netlink_messages(sock.recv(NETLINK_BUFFER)):
+                if kind == NLMSG_DONE:
+                    return replies
+                if kind == NLMSG_ERROR:
+                    error = -struct.unpack_from("=i", payload)[0]
+                    raise OSError(error, os.strerror(error))
+                replies.append((kind, payload))
+
+def read_sys_net(name, attribute):
+    with open(os.path.join(SYS_CLASS_NET, name, attribute)) as f:
+        return f.read().strip()
+
+def interface_mac(name):
+    """MAC of an Ethernet-type interface, '' for anything else (loopback, tunnels)"""
+    return read_sys_net(name, 'address') if int(read_sys_net(name, 'type')) == ARPHRD_ETHER else ''
+
+# When two sources report the same IP, the fields of the higher-priority one win
+SOURCE_PRIORITY = {'LAN Device': 0, 'Local Interface': 1}
+
+class DeviceRegistry:
+    """Discovered devices indexed by IP and by MAC, merging what several sources report.
+    
+    Devices are dicts with ip, mac, type and (local interfaces) name. Adding, looking up
+    and removing are O(1), so deduplicating even a very large ARP table is one linear pass.
+    Iterates in first-seen order.
+    """
+    
+    def __init__(self):
+        self.by_ip = {}
+        self.by_mac = {}  # mac -> {ip: None}
+        self.updated = datetime.now()
+    
+    def __len__(self):
+        return len(self.by_ip)
+    
+    def __iter__(self):
+        return iter(self.by_ip.values())
+    
+    def get(self, ip):
+        return self.by_ip.get(ip)
+    
+    def with_mac(self, mac):
+        """Every device currently answering with this MAC"""
+        return [self.by_ip[ip] for ip in self.by_mac.get(mac.lower(), ())]
+    
+    def _index_mac(self, device):
+        if device.get('mac'):
+            self.by_mac.setdefault(device['mac'].lower(), {})[device['ip']] = None
+    
+    def _unindex_mac(self, device):
+        mac = (device.get('mac') or '').lower()
+        ips = self.by_mac.get(mac)
+        if ips is not None:
+            ips.pop(device['ip'], None)
+            if not ips:
+                del self.by_mac[mac]
+    
+    def add(self, device):
+        """Record a device, merged with what is already known for its IP; returns the merged entry"""
+        old = self.by_ip.get(device['ip'])
+        if old is None:
+            merged = dict(device)
+        else:
+            # Equal priority: the newer report wins. Empty fields never overwrite known ones.
+            if SOURCE_PRIORITY.get(device['type'], 0) >= SOURCE_PRIORITY.get(old['type'], 0):
+                winner, loser = device, old
+            else:
+                winner, loser = old, device
+            merged = {**loser, **{key: value for key, value in winner.items() if value}}
+            self._unindex_mac(old)
+        self.by_ip[merged['ip']] = merged
+        self._index_mac(merged)
+        self.updated = datetime.now()
+        return merged
+    
+    def remove(self, ip, source=None):
+        """Forget ip, but only if its entry has type source when one is given; returns the entry or None"""
+        old = self.by_ip.get(ip)
+        if old is None or (source and old['type'] != source):
+            return None
+        del self.by_ip[ip]
+        self._unindex_mac(old)
+        self.updated = datetime.now()
+        return old
+
 class CrossPlatformNetworkScanner:
     def __init__(self):
         self.system = platform.system().lower()
+        # On Linux, interfaces and neighbours come from /sys, /proc and netlink when available
+        self.fast_path = (self.system == "linux" and os.path.isdir(SYS_CLASS_NET)
+                          and os.path.exists(PROC_NET_ARP))
+        # DeviceRegistry of the latest discovery, shared by display, save and monitoring
+        self.snapshot = None
         print(f"🔍 Detected OS: {platform.system()} {platform.release()}")
     
     def get_local_ip(self):
@@ -23,90 +174,155 @@ class CrossPlatformNetworkScanner:
         except:
             return "127.0.0.1"
     
+    def read_ipv4_addresses(self):
+        """{interface index: [IPv4 addresses]} from a netlink address dump"""
+        addresses = {}
+        request = IFADDRMSG.pack(socket.AF_INET, 0, 0, 0, 0)
+        for kind, payload in netlink_dump(RTM_GETADDR, request):
+            if kind != RTM_NEWADDR:
+                continue
+            family, _, _, _, index = IFADDRMSG.unpack_from(payload)
+            attrs = parse_rtattrs(payload, IFADDRMSG.size)
+            address = attrs.get(IFA_LOCAL) or attrs.get(IFA_ADDRESS)
+            if family == socket.AF_INET and address:
+                addresses.setdefault(index, []).append(socket.inet_ntoa(address))
+        return addresses
+    
+    def read_ipv6_addresses(self):
+        """{interface name: [IPv6 addresses]} from /proc/net/if_inet6"""
+        addresses = {}
+        try:
+            with open(PROC_NET_IF_INET6) as f:
+                for line in f:
+                    fields = line.split()
+                    if len(fields) == 6:
+                        address = socket.inet_ntop(socket.AF_INET6, bytes.fromhex(fields[0]))
+                        addresses.setdefault(fields[5], []).append(address)
+        except FileNotFoundError:
+            pass  # IPv6 disabled
+        return addresses
+    
+    def read_interfaces_linux(self):
+        """Interfaces from /sys/class/net, netlink and /proc/net/if_inet6, without spawning a process"""
+        ipv4 = self.read_ipv4_addresses()
+        ipv6 = self.read_ipv6_addresses()
+        found = []
+        for name in os.listdir(SYS_CLASS_NET):
+            index = int(read_sys_net(name, 'ifindex'))
+            # Like `ip addr`, only Ethernet-type links report a MAC
+            found.append((index, {'name': name, 'ip': ipv4.get(index, []), 'ipv6': ipv6.get(name, []),
+                                  'mac': interface_mac(name)}))
+        return {interface['name']: interface for _, interface in sorted(found, key=lambda item: item[0])}
+    
     def get_network_info_linux(self):
-        """Get network info for Linux"""
+        """Get network info for Linux, as {interface name: interface}"""
         devices = []
         
+        if self.fast_path:
+            try:
+                return self.read_interfaces_linux()
+            except OSError as e:
+                # No netlink (restricted container): fall back to parsing `ip addr`
+                print(f"Reading interfaces directly failed ({e}), using 'ip addr'")
+        
         try:
             # Method 1: Using ip command
             result = subprocess.run(["ip", "addr"], capture_output=True, text=True)
-            interfaces = []
-            current_interface = None
+            interfaces = {}
+            current = None
             
             for line in result.stdout.split('\n'):
                 if line and not line.startswith(' '):
                     # New interface
                     match = re.search(r'^\d+:\s+(\w+):', line)
                     if match:
-                        current_interface = match.group(1)
-                        interfaces.append({'name': current_interface, 'ip': [], 'mac': ''})
-                elif current_interface and 'link/ether' in line:
+                        current = interfaces.setdefault(match.group(1), {'name': match.group(1), 'ip': [],
+                                                                         'ipv6': [], 'mac': ''})
+                elif current and 'link/ether' in line:
                     # MAC address
                     mac_match = re.search(r'link/ether\s+([0-9a-f:]+)', line, re.IGNORECASE)
                     if mac_match:
-                        for interface in interfaces:
-                            if interface['name'] == current_interface:
-                                interface['mac'] = mac_match.group(1)
-                elif current_interface and 'inet ' in line:
+                        current['mac'] = mac_match.group(1)
+                elif current and 'inet ' in line:
                     # IP address
                     ip_match = re.search(r'inet\s+(\d+\.\d+\.\d+\.\d+)/', line)
                     if ip_match:
-                        for interface in interfaces:
-                            if interface['name'] == current_interface:
-                                interface['ip'].append(ip_match.group(1))
+                        current['ip'].append(ip_match.group(1))
+                elif current and 'inet6 ' in line:
+                    # IPv6 address
+                    ip_match = re.search(r'inet6\s+([0-9a-f:]+)/', line, re.IGNORECASE)
+                    if ip_match:
+                        current['ipv6'].append(ip_match.group(1))
             
             return interfaces
             
         except Exception as e:
             print(f"Error getting Linux network info: {e}")
-            return []
+            return {}
     
     def get_network_info_windows(self):
-        """Get network info for Windows"""
+        """Get network info for Windows, as {interface name: interface}"""
         devices = []
         
         try:
             # Method 1: Using ipconfig
             result = subprocess.run(["ipconfig", "/all"], capture_output=True, text=True, shell=True)
             
-            interfaces = []
-            current_interface = None
+            interfaces = {}
+            current = None
             
             for line in result.stdout.split('\n'):
                 line = line.strip()
                 
                 # Interface name
                 if line and not line.startswith(' ') and 'adapter' in line.lower():
-                    current_interface = line.replace('adapter', '').replace(':', '').strip()
-                    interfaces.append({'name': current_interface, 'ip': [], 'mac': ''})
+                    name = line.replace('adapter', '').replace(':', '').strip()
+                    current = interfaces.setdefault(name, {'name': name, 'ip': [], 'ipv6': [], 'mac': ''})
                 
                 # Physical Address (MAC)
-                elif current_interface and 'physical address' in line.lower():
+                elif current and 'physical address' in line.lower():
                     mac_match = re.search(r'([0-9A-Fa-f-]{17})', line)
                     if mac_match:
-                        for interface in interfaces:
-                            if interface['name'] == current_interface:
-                                interface['mac'] = mac_match.group(1).replace('-', ':')
+                        current['mac'] = mac_match.group(1).replace('-', ':')
                 
                 # IPv4 Address
-                elif current_interface and 'ipv4 address' in line.lower():
+                elif current and 'ipv4 address' in line.lower():
                     ip_match = re.search(r'(\d+\.\d+\.\d+\.\d+)', line)
                     if ip_match:
-                        for interface in interfaces:
-                            if interface['name'] == current_interface:
-                                interface['ip'].append(ip_match.group(1))
+                        current['ip'].append(ip_match.group(1))
+                
+                # IPv6 Address / Link-local IPv6 Address, e.g. "fe80::1%12(Preferred)"
+                elif current and 'ipv6 address' in line.lower() and ': ' in line:
+                    ip_match = re.match(r'([0-9A-Fa-f:]*:[0-9A-Fa-f:]*)', line.split(': ', 1)[1])
+                    if ip_match:
+                        current['ipv6'].append(ip_match.group(1).lower())
             
             return interfaces
             
         except Exception as e:
             print(f"Error getting Windows network info: {e}")
-            return []
+            return {}
+    
+    def read_arp_linux(self):
+        """Complete entries of the kernel ARP table, from /proc/net/arp"""
+        arp_table = []
+        with open(PROC_NET_ARP) as f:
+            next(f)  # header
+            for line in f:
+                # IP address, HW type, Flags, HW address, Mask, Device
+                fields = line.split()
+                if len(fields) >= 6 and int(fields[2], 16) & ATF_COM:
+                    arp_table.append({'ip': fields[0], 'mac': fields[3], 'type': 'LAN Device'})
+        return arp_table
     
     def scan_arp_table(self):
         """Scan ARP table for IP-MAC mappings"""
         arp_table = []
         
         try:
+            if self.fast_path:
+                return self.read_arp_linux()
+            
             if self.system == "linux":
                 # Linux ARP table
                 result = subprocess.run(["arp", "-a"], capture_output=True, text=True)
@@ -144,42 +360,54 @@ class CrossPlatformNetworkScanner:
         return arp_table
     
     def get_network_devices(self):
-        """Get all network devices with IP and MAC addresses"""
+        """Get all network devices with IP and MAC addresses; the result is kept as self.snapshot"""
         print("\n🌐 Scanning Network Devices...")
         print("=" * 60)
         
+        self.snapshot = self.discover_devices()
+        return self.snapshot
+    
+    def discover_devices(self):
+        """One discovery pass over the local interfaces and the ARP table, as a DeviceRegistry"""
         # Get local network interfaces
         if self.system == "linux":
-            interfaces = self.get_network_info_linux()
+            get_interfaces = self.get_network_info_linux
         else:
-            interfaces = self.get_network_info_windows()
+            get_interfaces = self.get_network_info_windows
         
-        # Get ARP table for other devices
-        arp_devices = self.scan_arp_table()
+        if self.fast_path:
+            # Direct reads take microseconds; a thread would cost more than it saves
+            interfaces = get_interfaces()
+            arp_devices = self.scan_arp_table()
+        else:
+            # Two process spawns: run them side by side
+            with ThreadPoolExecutor(max_workers=2) as pool:
+                pending_interfaces = pool.submit(get_interfaces)
+                # Get ARP table for other devices
+                arp_devices = pool.submit(self.scan_arp_table).result()
+                interfaces = pending_interfaces.result()
         
         # Combine results
-        all_devices = []
+        registry = DeviceRegistry()
         
-        # Add local interfaces
-        for interface in interfaces:
-            if interface['ip'] or interface['mac']:
-                for ip in interface['ip']:
-                    all_devices.append({
-                        'ip': ip,
-                        'mac': interface['mac'],
-                        'name': interface['name'],
-                        'type': 'Local Interface'
-                    })
+        # Add local interfaces, IPv4 and IPv6 addresses alike
+        for interface in interfaces.values():
+            for ip in interface['ip'] + interface['ipv6']:
+                registry.add({
+                    'ip': ip,
+                    'mac': interface['mac'],
+                    'name': interface['name'],
+                    'type': 'Local Interface'
+                })
         
-        # Add ARP table devices (avoid duplicates)
+        # Add ARP table devices (merged into local interfaces with the same IP)
         for arp_device in arp_devices:
-            if not any(device['ip'] == arp_device['ip'] for device in all_devices):
-                all_devices.append(arp_device)
+            registry.add(arp_device)
         
-        return all_devices
+        return registry
     
     def display_network_info(self):
-        """Display comprehensive network information"""
+        """Display comprehensive network information; returns the devices shown"""
         print(f"\n🖥️  Cross-Platform Network Scanner")
         print(f"📅 {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
         print("=" * 70)
@@ -195,11 +423,13 @@ class CrossPlatformNetworkScanner:
         
         if not devices:
             print("❌ No network devices found")
-            return
+            return devices
         
+        # IPv6 addresses are wider than the usual 20-character column
+        width = max(20, max(len(device['ip']) + 1 for device in devices))
         print(f"\n📱 Found {len(devices)} Network Device(s):")
         print("-" * 70)
-        print(f"{'IP Address':<20} {'MAC Address':<20} {'Type/Name':<25}")
+        print(f"{'IP Address':<{width}} {'MAC Address':<20} {'Type/Name':<25}")
         print("-" * 70)
         
         for device in devices:
@@ -207,15 +437,114 @@ class CrossPlatformNetworkScanner:
             mac = device.get('mac', 'N/A')
             name_type = device.get('name', device.get('type', 'Unknown'))
             
-            print(f"{ip:<20} {mac:<20} {name_type:<25}")
+            print(f"{ip:<{width}} {mac:<20} {name_type:<25}")
+        
+        return devices
+    
+    def parse_netlink_event(self, kind, payload):
+        """(ip, source type, device or None if it is gone) for an IPv4 neighbour/address event, else None"""
+        if kind in (RTM_NEWNEIGH, RTM_DELNEIGH):
+            family, _, _, _, state, _, _ = NDMSG.unpack_from(payload)
+            attrs = parse_rtattrs(payload, NDMSG.size)
+            if family != socket.AF_INET or NDA_DST not in attrs:
+                return None
+            ip = socket.inet_ntoa(attrs[NDA_DST])
+            mac = attrs.get(NDA_LLADDR)
+            # Same rule as the ARP table: only resolved entries count as present
+            if kind == RTM_DELNEIGH or state & (NUD_INCOMPLETE | NUD_FAILED) or not mac:
+                return ip, 'LAN Device', None
+            return ip, 'LAN Device', {'ip': ip, 'mac': ':'.join(f"{b:02x}" for b in mac), 'type': 'LAN Device'}
+        
+        if kind in (RTM_NEWADDR, RTM_DELADDR):
+            family, _, _, _, index = IFADDRMSG.unpack_from(payload)
+            attrs = parse_rtattrs(payload, IFADDRMSG.size)
+            address = attrs.get(IFA_LOCAL) or attrs.get(IFA_ADDRESS)
+            if family != socket.AF_INET or not address:
+                return None
+            ip = socket.inet_ntoa(address)
+            if kind == RTM_DELADDR:
+                return ip, 'Local Interface', None
+            name = socket.if_indextoname(index)
+            return ip, 'Local Interface', {'ip': ip, 'mac': interface_mac(name), 'name': name,
+                                           'type': 'Local Interface'}
+        return None
+    
+    def update_device_table(self, registry, ip, source, device):
+        """Apply one observation to a DeviceRegistry; returns the change as a line to print, or None"""
+        if device is None:
+            # A neighbour going away never removes one of our own addresses, and vice versa
+            old = registry.remove(ip, source)
+            if old is None:
+                return None
+            # Only a neighbour entry that is deleted or FAILED counts as gone; while both are
+            # live, several IPs per MAC are normal (multi-homed hosts, proxy ARP)
+            elsewhere = []
+            if old['type'] == 'LAN Device' and old['mac']:
+                elsewhere = [other['ip'] for other in registry.with_mac(old['mac']) if other['type'] == 'LAN Device']
+            if elsewhere:
+                return f"🔀 Moved        {ip} -> {elsewhere[-1]:<20} {old['mac']}"
+            return f"🔴 Left         {ip:<20} {old['mac']:<20} {old.get('name', old['type'])}"
+        old = registry.get(ip)
+        new = registry.add(device)
+        if old is None:
+            return f"🟢 Joined       {ip:<20} {new['mac']:<20} {new.get('name', new['type'])}"
+        if old['mac'] != new['mac']:
+            return f"🔄 MAC changed  {ip:<20} {old['mac']} -> {new['mac']}"
+        return None
+    
+    def monitor_network(self):
+        """Print device changes as the kernel reports them, via rtnetlink neighbour and address events.
+        
+        Blocks in recv() between events, so it reacts immediately and costs nothing while idle.
+        Raises OSError if netlink is unavailable.
+        """
+        with socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, socket.NETLINK_ROUTE) as sock:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, NETLINK_EVENT_BUFFER)
+            sock.bind((0, RTMGRP_NEIGH | RTMGRP_IPV4_IFADDR))
+            # Subscribed before the snapshot, so nothing changing in between is missed.
+            # Events are applied to self.snapshot, so saving while monitoring stays current.
+            self.display_network_info()
+            registry = self.snapshot
+            print(f"\n👀 Watching for changes (Ctrl+C to stop)...")
+            
+            while True:
+                try:
+                    data = sock.recv(NETLINK_BUFFER)
+                except OSError as e:
+                    if e.errno != errno.ENOBUFS:
+                        raise
+                    # Events were dropped: re-read the tables and report what differs
+                    print("⚠️  Event queue overflowed, re-reading device table")
+                    current = self.discover_devices()
+                    changes = [(device['ip'], device['type'], device) for device in current]
+                    changes += [(device['ip'], device['type'], None) for device in list(registry)
+                                if current.get(device['ip']) is None]
+                else:
+                    changes = []
+                    for kind, payload in iter_netlink_messages(data):
+                        try:
+                            event = self.parse_netlink_event(kind, payload)
+                        except OSError:
+                            continue  # interface vanished before its name or MAC could be looked up
+                        if event:
+                            changes.append(event)
+                
+                for ip, source, device in changes:
+                    change = self.update_device_table(registry, ip, source, device)
+                    if change:
+                        print(f"[{datetime.now().strftime('%H:%M:%S')}] {change}")
     
-    def save_to_file(self, filename=None):
-        """Save network scan results to file"""
+    def save_to_file(self, filename=None, refresh=False):
+        """Save network scan results to file; reuses the latest snapshot unless refresh or there is none"""
         if not filename:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             filename = f"network_scan_{timestamp}.txt"
         
-        devices = self.get_network_devices()
+        if refresh or self.snapshot is None:
+            devices = self.get_network_devices()
+        else:
+            devices = self.snapshot
+            print(f"📋 Using the scan from {devices.updated.strftime('%H:%M:%S')} (option 1 rescans)")
         
         with open(filename, 'w') as f:
             f.write("Network Scan Results\n")
@@ -227,14 +556,15 @@ class CrossPlatformNetworkScanner:
             
             f.write("Network Devices:\n")
             f.write("-" * 50 + "\n")
-            f.write(f"{'IP Address':<20} {'MAC Address':<20} {'Type/Name':<25}\n")
+            width = max([20] + [len(device['ip']) + 1 for device in devices])
+            f.write(f"{'IP Address':<{width}} {'MAC Address':<20} {'Type/Name':<25}\n")
             f.write("-" * 50 + "\n")
             
             for device in devices:
                 ip = device.get('ip', 'N/A')
                 mac = device.get('mac', 'N/A')
                 name_type = device.get('name', device.get('type', 'Unknown'))
-                f.write(f"{ip:<20} {mac:<20} {name_type:<25}\n")
+                f.write(f"{ip:<{width}} {mac:<20} {name_type:<25}\n")
         
         print(f"💾 Results saved to: {filename}")
 
@@ -270,6 +600,11 @@ def main():
             elif choice == "3":
                 print("\n🔄 Starting Continuous Monitoring (Ctrl+C to stop)...")
                 try:
+                    if scanner.fast_path:
+                        try:
+                            scanner.monitor_network()
+                        except OSError as e:
+                            print(f"Netlink monitoring unavailable ({e}), polling every 10 seconds")
                     while True:
                         scanner.display_network_info()
                         print("\n⏳ Refreshing in 10 seconds...")
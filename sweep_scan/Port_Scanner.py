@@ -2,14 +2,32 @@
 import socket
 import subprocess
 import re
+import os
 import sys
+import argparse
+from collections import defaultdict
 from concurrent.futures import ThreadPoolExecutor
+from scan_engine import (PortScanEngine, scan_ports, OPEN, ERROR,
+                         MAX_CONCURRENCY, PER_HOST_CONCURRENCY, DEFAULT_TIMEOUT)
+from targets import parse_port_spec, TargetSet, load_hosts_file, interleave
+from rtt import HostRTTTable, DEFAULT_MIN_TIMEOUT, DEFAULT_MAX_TIMEOUT
+from result_sinks import JsonlSink, CsvSink
+from icmp_sweep import icmp_sweep, IcmpUnavailable
+from pacing import RateLimiter, add_pacing_arguments, limiter_from_args
+from result_store import ResultStore, add_store_arguments, parse_since
+from fingerprint import Fingerprinter
 
 # Define common ports globally so all functions can access it
 COMMON_PORTS = [
     21, 22, 23, 25, 80, 139, 443, 445, 3389, 8080, 8443
 ]
 
+# Per-host RTT estimates shared by the ping sweep and the port scans
+RTT_TABLE = HostRTTTable()
+# Probe pacing shared by the ping sweep and the port scans
+LIMITER = RateLimiter()
+PING_TIME_RE = re.compile(r'time[=<]\s*([\d.]+)\s*ms', re.IGNORECASE)
+
 def get_connected_network_simple():
     """Get connected network information (local IP and gateway)"""
     try:
@@ -92,6 +110,7 @@ def ping_sweep_simple(network_prefix):
     active_ips = []
     
     def ping_host(ip):
+        LIMITER.wait(ip)
         try:
             # Determine ping command based on OS
             if sys.platform.startswith("win"):  # Windows
@@ -109,6 +128,10 @@ def ping_sweep_simple(network_prefix):
                     timeout=3
                 )
             if result.returncode == 0:
+                # Seed the host's RTT estimate from the reply time
+                rtt_match = PING_TIME_RE.search(result.stdout.decode(errors='ignore'))
+                if rtt_match:
+                    RTT_TABLE.record(ip, float(rtt_match.group(1)) / 1000)
                 return ip
         except:
             pass
@@ -117,6 +140,13 @@ def ping_sweep_simple(network_prefix):
     # Generate IPs to scan (1-254 in the network)
     ip_range = [f"{network_prefix}{i}" for i in range(1, 255)]
     
+    # In-process ICMP sweep; replies seed the per-host RTT estimates
+    try:
+        return sorted(icmp_sweep(ip_range, limiter=LIMITER, on_reply=RTT_TABLE.record),
+                      key=lambda ip: socket.inet_aton(ip))
+    except IcmpUnavailable:
+        print("⚠️  ICMP socket unavailable, falling back to system ping...")
+    
     # Multi-threaded ping
     with ThreadPoolExecutor(max_workers=50) as executor:
         results = executor.map(ping_host, ip_range)
@@ -129,23 +159,8 @@ def scan_common_ports(target_ip):
     print(f"\n🔎 Scanning common ports on {target_ip}...")
     print("⏳ This may take a few seconds...")
     
-    open_ports = []
-    
-    def check_port(port):
-        try:
-            with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
-                sock.settimeout(0.2)
-                result = sock.connect_ex((target_ip, port))
-                if result == 0:
-                    open_ports.append(port)
-        except:
-            pass
-    
-    # Multi-threaded port scanning using global COMMON_PORTS
-    with ThreadPoolExecutor(max_workers=200) as executor:
-        executor.map(check_port, COMMON_PORTS)
-    
-    return sorted(open_ports)
+    # Non-blocking connects driven by the asyncio engine using global COMMON_PORTS
+    return scan_ports(target_ip, COMMON_PORTS, rtt=RTT_TABLE, limiter=LIMITER)
 
 def get_service_name(port):
     """Get common service name for port"""
@@ -158,6 +173,34 @@ def get_service_name(port):
     }
     return services.get(port, "Unknown")
 
+def describe_service(port, fingerprint=None):
+    """Fingerprinted service name, falling back to the static port table"""
+    if fingerprint and fingerprint.service:
+        return fingerprint.service
+    return get_service_name(port)
+
+def fingerprint_ports(target_ip, open_ports):
+    """Banner-grab and probe the open ports of one host"""
+    print("🔬 Identifying services on open ports...")
+    results = Fingerprinter(limiter=LIMITER).fingerprint_all((target_ip, port) for port in open_ports)
+    return {port: results.get((target_ip, port)) for port in open_ports}
+
+def print_open_ports(open_ports, fingerprints=None):
+    """Print open ports in the OPEN/port/service table format"""
+    if open_ports:
+        print(f"✅ Found {len(open_ports)} open ports:")
+        width = 70 if fingerprints else 40
+        print("-" * width)
+        print(f"{'Port':<8} {'Service':<12} {'Status':<10}" + (" Version" if fingerprints else ""))
+        print("-" * width)
+        for port in open_ports:
+            fingerprint = fingerprints.get(port) if fingerprints else None
+            service = describe_service(port, fingerprint)
+            version = (fingerprint.version or "") if fingerprint else ""
+            print(f"{port:<8} {service:<12} {'OPEN':<10}" + (f" {version}" if fingerprints else ""))
+    else:
+        print("❌ No common open ports found")
+
 def main():
     print("🌐 Network IP Scanner with Common Port Scanning")
     print("=" * 50)
@@ -226,21 +269,13 @@ def main():
 
     # Scan common ports on selected IP
     open_ports = scan_common_ports(target_ip)
+    fingerprints = fingerprint_ports(target_ip, open_ports) if open_ports else None
     
     # Display results
     print(f"\n📊 Port Scan Results for {original_target_input} ({target_ip}):")
     print("=" * 50)
     
-    if open_ports:
-        print(f"✅ Found {len(open_ports)} open ports:")
-        print("-" * 40)
-        print(f"{'Port':<8} {'Service':<12} {'Status':<10}")
-        print("-" * 40)
-        for port in open_ports:
-            service = get_service_name(port)
-            print(f"{port:<8} {service:<12} {'OPEN':<10}")
-    else:
-        print("❌ No common open ports found")
+    print_open_ports(open_ports, fingerprints)
     
     print(f"\n🎯 Scanned {len(COMMON_PORTS)} common ports")
     
@@ -255,5 +290,157 @@ def main():
         else:
             print("❌ Please enter 'y' or 'n'")
 
+def parse_arguments():
+    """Command line options for the non-interactive multi-host mode"""
+    parser = argparse.ArgumentParser(
+        description='Scan many hosts and ports in one scheduled run.',
+        epilog="Example: python3 Port_Scanner.py 192.168.1.0/24 -iL more_hosts.txt -p 1-1024,3306,top100"
+    )
+    parser.add_argument('targets', nargs='*', help='IPs, CIDRs, ranges or hostnames to scan')
+    parser.add_argument('-iL', '--input-list', action='append', default=[],
+                        help='File with one target per line (may be repeated)')
+    parser.add_argument('--exclude', action='append', default=[],
+                        help='Target spec to skip (may be repeated)')
+    parser.add_argument('--random', action='store_true',
+                        help='Probe hosts in a random order to spread load across subnets')
+    parser.add_argument('-p', '--ports', default=','.join(map(str, COMMON_PORTS)),
+                        help='Port spec, e.g. 1-1024,3306,8000-8100,top1000 (default: common ports)')
+    parser.add_argument('--concurrency', type=int, default=MAX_CONCURRENCY,
+                        help=f'Maximum probes in flight (default: {MAX_CONCURRENCY})')
+    parser.add_argument('--per-host', type=int, default=PER_HOST_CONCURRENCY,
+                        help=f'Maximum probes in flight per host (default: {PER_HOST_CONCURRENCY})')
+    parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT,
+                        help=f'Initial connect timeout before a host\'s RTT is known (default: {DEFAULT_TIMEOUT})')
+    parser.add_argument('--min-timeout', type=float, default=DEFAULT_MIN_TIMEOUT,
+                        help=f'Lower clamp for RTT-derived timeouts (default: {DEFAULT_MIN_TIMEOUT})')
+    parser.add_argument('--max-timeout', type=float, default=DEFAULT_MAX_TIMEOUT,
+                        help=f'Upper clamp for RTT-derived timeouts (default: {DEFAULT_MAX_TIMEOUT})')
+    parser.add_argument('--jsonl', metavar='FILE',
+                        help="Stream results as JSON lines to FILE ('-' for stdout)")
+    parser.add_argument('--csv', metavar='FILE',
+                        help="Stream results as CSV to FILE ('-' for stdout)")
+    parser.add_argument('--all-states', action='store_true',
+                        help='Write closed/filtered results to the sinks too (default: open only)')
+    parser.add_argument('--fingerprint', action='store_true',
+                        help='Identify services on open ports by banner grabbing and protocol probes')
+    add_pacing_arguments(parser)
+    add_store_arguments(parser)
+    return parser.parse_args()
+
+def cli_main():
+    """Non-interactive mode: scan the full host x port cross product in one run"""
+    args = parse_arguments()
+
+    try:
+        ports = parse_port_spec(args.ports)
+    except ValueError as e:
+        print(f"❌ Invalid port specification: {e}")
+        sys.exit(1)
+
+    try:
+        cutoff = parse_since(args.since) if args.since else None
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    if cutoff and not args.db:
+        print("❌ --since requires --db")
+        sys.exit(1)
+
+    specs = list(args.targets)
+    try:
+        for path in args.input_list:
+            specs.extend(load_hosts_file(path))
+        hosts = TargetSet(specs, exclude=args.exclude, randomize=args.random)
+    except (OSError, ValueError) as e:
+        print(f"❌ Could not load targets: {e}")
+        sys.exit(1)
+
+    if not hosts:
+        print("❌ No targets given. Pass IPs/CIDRs/hostnames or use -iL <file>.")
+        sys.exit(1)
+
+    sinks = []
+    if args.jsonl:
+        sinks.append(JsonlSink(args.jsonl))
+    if args.csv:
+        sinks.append(CsvSink(args.csv))
+    # Keep stdout clean when a sink is being piped through it
+    quiet = '-' in (args.jsonl, args.csv)
+    report = (lambda *a, **k: print(*a, file=sys.stderr, **k)) if quiet else print
+    report(f"🔎 Scanning {len(hosts)} host(s) x {len(ports)} port(s)...")
+
+    rtt = HostRTTTable(initial=args.timeout, minimum=args.min_timeout, maximum=args.max_timeout)
+    engine = PortScanEngine(max_concurrency=args.concurrency, per_host=args.per_host, rtt=rtt,
+                            limiter=limiter_from_args(args))
+    store = ResultStore(args.db) if args.db else None
+    pairs = interleave(hosts, ports)
+    if cutoff:
+        # Incremental mode: only reprobe pairs that are unknown, stale or changed
+        pairs = ((ip, port) for ip, port in pairs if store.port_needs_probe(ip, port, cutoff))
+    open_ports = defaultdict(list)
+    fingerprints = {}
+    try:
+        try:
+            # Results stream in as each probe completes; only open ports are kept in memory
+            for result in engine.iter_scan(pairs):
+                if result.state == ERROR:
+                    report(f"⚠️  {result.ip}:{result.port} not probed: out of sockets")
+                    continue
+                if store:
+                    store.record_port(result.ip, result.port, result.state,
+                                      get_service_name(result.port) if result.state == OPEN else None)
+                if result.state == OPEN:
+                    open_ports[result.ip].append(result.port)
+                    report(f"✅ OPEN  {result.ip}:{result.port} ({get_service_name(result.port)})")
+                if result.state == OPEN or args.all_states:
+                    for sink in sinks:
+                        sink(result)
+        except KeyboardInterrupt:
+            report("\n🛑 Scan interrupted, showing partial results")
+        except BrokenPipeError:
+            # Downstream consumer went away (e.g. piped into head): silence stdout and stop
+            os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+            return
+        finally:
+            for sink in sinks:
+                sink.close()
+
+        if store and cutoff:
+            # Fill in the open ports we skipped because they were fresh in the store
+            wanted = set(ports)
+            for ip in hosts:
+                fresh = [port for port, _ in store.open_ports(ip)
+                         if port in wanted and port not in open_ports.get(ip, ())]
+                if fresh:
+                    open_ports[ip].extend(fresh)
+
+        if args.fingerprint and open_ports:
+            # Banner-grab and probe only the ports found open
+            report(f"\n🔬 Fingerprinting {sum(map(len, open_ports.values()))} open port(s)...")
+            fingerprinter = Fingerprinter(limiter=engine.limiter, store=store)
+            fingerprints = fingerprinter.fingerprint_all(
+                (ip, port) for ip, found in open_ports.items() for port in found)
+            if store:
+                for (ip, port), fp in fingerprints.items():
+                    if fp.service:
+                        store.record_port(ip, port, OPEN, fp.service)
+    finally:
+        if store:
+            store.close()
+
+    if not quiet:
+        for ip in sorted(open_ports, key=socket.inet_aton):
+            print(f"\n📊 Port Scan Results for {ip}:")
+            print("=" * 50)
+            print_open_ports(sorted(open_ports[ip]),
+                             {port: fingerprints.get((ip, port)) for port in open_ports[ip]}
+                             if fingerprints else None)
+
+    report(f"\n🎯 Scanned {len(ports)} port(s) on {len(hosts)} host(s), "
+           f"{len(open_ports)} host(s) with open ports")
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    if len(sys.argv) > 1:
+        cli_main()
+    else:
+        main()
\ No newline at end of file
@@ -0,0 +1,194 @@
+#!/usr/bin/python3
+"""Service/banner fingerprinting for ports found open.
+
+Each open port is first read passively (SSH, FTP, SMTP, POP3, IMAP, MySQL,
+VNC and telnet all talk first). Silent ports get protocol-specific probes,
+ordered by what the port number suggests: an HTTP request, a TLS handshake
+(followed by an HTTP request inside it) and a Redis PING. All signatures
+are compiled into one regex with a named group per service, so a banner
+is matched in a single pass. Results are cached per (ip, port, banner hash).
+"""
+import asyncio
+import hashlib
+import re
+import ssl
+from collections import namedtuple
+
+BANNER_TIMEOUT = 2.0
+READ_SIZE = 4096
+MAX_CONCURRENCY = 100
+
+Fingerprint = namedtuple("Fingerprint", ["service", "version", "tls"])
+UNKNOWN = Fingerprint(None, None, False)
+
+# (service, pattern). Patterns are bytes, anchored at the start of the
+# response and tried in this order; a group named 'v' captures the version.
+SIGNATURES = [
+    ("SSH", rb"SSH-[\d.]+-(?P<v>[^\r\n]+)"),
+    ("FTP", rb"220[ -](?P<v>[^\r\n]*(?:FTP|FileZilla|vsFTPd|ProFTPD|Pure-FTPd)[^\r\n]*)"),
+    ("SMTP", rb"220[ -](?P<v>[^\r\n]*(?:SMTP|Postfix|Exim|Sendmail|Mail)[^\r\n]*)"),
+    ("FTP/SMTP", rb"220[ -](?P<v>[^\r\n]*)"),
+    ("POP3", rb"\+OK(?P<v>[^\r\n]*)"),
+    ("IMAP", rb"\* (?:OK|PREAUTH)(?P<v>[^\r\n]*)"),
+    ("HTTP", rb"HTTP/\d(?:\.\d)? \d{3}(?:.*?\r\n[Ss]erver: *(?P<v>[^\r\n]+))?"),
+    ("MySQL", rb"....\x0a(?P<v>\d[\w.\-]*)\x00"),
+    ("VNC", rb"RFB (?P<v>\d{3}\.\d{3})"),
+    ("Redis", rb"(?:\+PONG|-NOAUTH|-ERR)(?P<v>)"),
+    ("RDP", rb"\x03\x00\x00.\x0e\xd0(?P<v>)"),
+    ("Telnet", rb"\xff[\xfb-\xfe](?P<v>)"),
+    ("TLS", rb"[\x15\x16]\x03[\x00-\x04](?P<v>)"),
+]
+
+
+def _compile_signatures(signatures):
+    """Join all signatures into one alternation with a named group per service"""
+    names = {}
+    parts = []
+    for i, (service, pattern) in enumerate(signatures):
+        group = f"s{i}"
+        names[group] = service
+        # Give every signature's version group a unique name
+        parts.append(b"(?P<" + group.encode() + b">" +
+                     pattern.replace(b"(?P<v>", b"(?P<" + group.encode() + b"v>") + b")")
+    return re.compile(rb"\A(?:" + b"|".join(parts) + rb")", re.DOTALL), names
+
+
+SIGNATURE_RE, SIGNATURE_NAMES = _compile_signatures(SIGNATURES)
+
+
+def match_banner(banner, tls=False):
+    """Match a response against every signature in one regex pass"""
+    match = SIGNATURE_RE.match(banner)
+    if not match:
+        return UNKNOWN
+    group = match.lastgroup
+    service = SIGNATURE_NAMES[group]
+    version = match.group(group + "v")
+    version = version.decode(errors="replace").strip() if version else None
+    if tls and service == "HTTP":
+        service = "HTTPS"
+    return Fingerprint(service, version, tls)
+
+
+HTTP_PROBE = b"GET / HTTP/1.0\r\nHost: %s\r\nUser-Agent: sweep_scan\r\n\r\n"
+REDIS_PROBE = b"PING\r\n"
+# X.224 Connection Request carrying an RDP negotiation request
+RDP_PROBE = bytes.fromhex("030000130ee000000000000100080003000000")
+
+TLS_PORTS = {443, 465, 636, 853, 993, 995, 5061, 8443, 9443}
+HTTP_PORTS = {80, 81, 591, 3000, 5000, 8000, 8008, 8080, 8081, 8888}
+
+
+def _probe_plan(port):
+    """Active probes to try on a silent port, most likely first"""
+    if port in TLS_PORTS:
+        return ["tls", "http"]
+    if port == 6379:
+        return ["redis"]
+    if port == 3389:
+        return ["rdp"]
+    if port in HTTP_PORTS:
+        return ["http", "tls"]
+    return ["http", "tls", "redis"]
+
+
+def _tls_context():
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
+    context.check_hostname = False
+    context.verify_mode = ssl.CERT_NONE
+    return context
+
+
+class Fingerprinter:
+    """Concurrent banner-grab and probe stage with a per-(ip, port, banner) cache.
+
+    store, if given, is a result_store.ResultStore used to persist the cache
+    across runs.
+    """
+
+    def __init__(self, timeout=BANNER_TIMEOUT, max_concurrency=MAX_CONCURRENCY,
+                 limiter=None, store=None):
+        self.timeout = timeout
+        self.max_concurrency = max_concurrency
+        self.limiter = limiter
+        self.store = store
+        self.cache = {}
+        self._tls = _tls_context()
+
+    async def _exchange(self, ip, port, payload=None, tls=False):
+        """Connect, optionally send payload, and return whatever arrives before the timeout"""
+        if self.limiter:
+            await self.limiter.wait_async(ip)
+        try:
+            reader, writer = await asyncio.wait_for(
+                asyncio.open_connection(ip, port, ssl=self._tls if tls else None), self.timeout)
+        except (OSError, asyncio.TimeoutError, ssl.SSLError):
+            return None
+        try:
+            if payload:
+                writer.write(payload)
+                await writer.drain()
+            return await asyncio.wait_for(reader.read(READ_SIZE), self.timeout)
+        except (OSError, asyncio.TimeoutError, ssl.SSLError):
+            return b""
+        finally:
+            writer.close()
+
+    async def _active_probe(self, ip, port):
+        http = HTTP_PROBE % ip.encode()
+        for probe in _probe_plan(port):
+            if probe == "tls":
+                response = await self._exchange(ip, port, http, tls=True)
+                if response is not None:
+                    # The handshake succeeded, so this is TLS whatever answers inside it
+                    result = match_banner(response, tls=True)
+                    return result if result.service else Fingerprint("TLS", None, True)
+                continue
+            payload = {"http": http, "redis": REDIS_PROBE, "rdp": RDP_PROBE}[probe]
+            response = await self._exchange(ip, port, payload)
+            if response:
+                result = match_banner(response)
+                if result.service:
+                    return result
+        return UNKNOWN
+
+    async def fingerprint(self, ip, port):
+        """Identify the service on one open port"""
+        banner = await self._exchange(ip, port)
+        if banner is None:
+            return UNKNOWN
+        if not banner:
+            # A silent port has nothing to key a cache entry on: its service could change
+            # without the key changing, so it is actively probed every time
+            return await self._active_probe(ip, port)
+        key = (ip, port, hashlib.sha1(banner).hexdigest())
+        cached = self.cache.get(key)
+        if cached is None and self.store:
+            row = self.store.get_fingerprint(*key)
+            cached = Fingerprint(*row) if row else None
+        if cached is not None:
+            return cached
+
+        result = match_banner(banner)
+        if not result.service:
+            result = await self._active_probe(ip, port)
+        self.cache[key] = result
+        if self.store:
+            self.store.put_fingerprint(*key, *result)
+        return result
+
+    async def run(self, pairs, on_result):
+        """Fingerprint every (ip, port) with at most max_concurrency in flight"""
+        slots = asyncio.Semaphore(self.max_concurrency)
+
+        async def one(ip, port):
+            async with slots:
+                on_result(ip, port, await self.fingerprint(ip, port))
+
+        await asyncio.gather(*(one(ip, port) for ip, port in pairs))
+
+    def fingerprint_all(self, pairs):
+        """Blocking helper returning {(ip, port): Fingerprint}"""
+        results = {}
+        asyncio.run(self.run(pairs, lambda ip, port, fp: results.__setitem__((ip, port), fp)))
+        return results
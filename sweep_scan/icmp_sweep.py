@@ -0,0 +1,129 @@
+#!/usr/bin/python3
+"""In-process ICMP echo sweep: one paced sender, one matching receiver.
+
+Uses an unprivileged ICMP datagram socket where the kernel allows it
+(Linux net.ipv4.ping_group_range, macOS), otherwise a raw socket (root /
+CAP_NET_RAW / Windows admin). When neither can be opened IcmpUnavailable
+is raised and callers fall back to spawning the system `ping`.
+"""
+import errno
+import os
+import select
+import socket
+import struct
+import threading
+import time
+from pacing import RateLimiter, DEFAULT_PPS
+
+ICMP_ECHO_REPLY = 0
+ICMP_ECHO_REQUEST = 8
+
+DEFAULT_TIMEOUT = 1.0
+PAYLOAD = b"sweep_scan-icmp-probe...."
+
+
+class IcmpUnavailable(Exception):
+    """Neither a datagram nor a raw ICMP socket could be opened."""
+
+
+def checksum(data):
+    """Internet checksum (RFC 1071)"""
+    if len(data) % 2:
+        data += b"\0"
+    total = sum(struct.unpack(f"!{len(data) // 2}H", data))
+    total = (total >> 16) + (total & 0xFFFF)
+    total += total >> 16
+    return ~total & 0xFFFF
+
+
+def build_echo_request(ident, seq):
+    header = struct.pack("!BBHHH", ICMP_ECHO_REQUEST, 0, 0, ident, seq)
+    csum = checksum(header + PAYLOAD)
+    return struct.pack("!BBHHH", ICMP_ECHO_REQUEST, 0, csum, ident, seq) + PAYLOAD
+
+
+def open_icmp_socket():
+    """Return (socket, is_raw), preferring the unprivileged datagram socket"""
+    for sock_type in (socket.SOCK_DGRAM, socket.SOCK_RAW):
+        try:
+            return socket.socket(socket.AF_INET, sock_type, socket.IPPROTO_ICMP), sock_type == socket.SOCK_RAW
+        except (PermissionError, OSError):
+            continue
+    raise IcmpUnavailable("no ICMP socket available (try running as root)")
+
+
+def icmp_sweep(addresses, timeout=DEFAULT_TIMEOUT, limiter=None, on_reply=None):
+    """Ping every address once and return {ip: rtt_seconds} for hosts that replied.
+
+    addresses may be a lazy iterable; it is consumed by the sender thread as
+    fast as the RateLimiter allows. on_reply(ip, rtt) is called from the
+    receiving thread as each reply is matched.
+    """
+    if limiter is None:
+        limiter = RateLimiter(pps=DEFAULT_PPS)
+    sock, is_raw = open_icmp_socket()
+    # Datagram sockets get their identifier rewritten (and replies demuxed) by
+    # the kernel; raw sockets see every ICMP packet so we filter on our own id.
+    ident = os.getpid() & 0xFFFF
+    sent = {}         # ip -> (seq, send_time)
+    alive = {}
+    sender_done = threading.Event()
+    last_send = [time.monotonic()]
+
+    def sender():
+        try:
+            for seq, ip in enumerate(addresses):
+                seq &= 0xFFFF
+                limiter.wait(ip)
+                sent[ip] = (seq, time.monotonic())
+                try:
+                    sock.sendto(build_echo_request(ident, seq), (ip, 0))
+                except OSError as e:
+                    # Unreachable network etc.: treat as no reply. A full send buffer is the
+                    # one sure sign of sending too fast, so only that counts as loss.
+                    if e.errno in (errno.ENOBUFS, errno.EAGAIN):
+                        limiter.record(True)
+                    continue
+                last_send[0] = time.monotonic()
+        finally:
+            sender_done.set()
+
+    thread = threading.Thread(target=sender, daemon=True)
+    thread.start()
+    try:
+        while True:
+            if sender_done.is_set() and time.monotonic() - last_send[0] > timeout:
+                break
+            readable, _, _ = select.select([sock], [], [], 0.05)
+            if not readable:
+                continue
+            try:
+                data, (src, _) = sock.recvfrom(1024)
+            except OSError:
+                continue
+            received = time.monotonic()
+            # Raw sockets (and macOS datagram sockets) deliver the IP header too; an ICMP
+            # echo reply starts with type 0, an IPv4 header with version nibble 4
+            if data and data[0] >> 4 == 4:
+                data = data[(data[0] & 0x0F) * 4:]
+            if len(data) < 8:
+                continue
+            icmp_type, _, _, reply_ident, seq = struct.unpack("!BBHHH", data[:8])
+            if icmp_type != ICMP_ECHO_REPLY or (is_raw and reply_ident != ident):
+                continue
+            probe = sent.get(src)
+            if probe is None or probe[0] != seq or src in alive:
+                continue
+            rtt = received - probe[1]
+            if rtt > timeout:
+                continue
+            alive[src] = rtt
+            # Most addresses in a sweep are simply unused, so silence is not fed back as
+            # loss; replies are, so spikes of send failures stand out against them
+            limiter.record(False, sent_at=probe[1])
+            if on_reply:
+                on_reply(src, rtt)
+    finally:
+        sock.close()
+    thread.join()
+    return alive
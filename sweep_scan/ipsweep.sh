@@ -4,15 +4,15 @@
 
 if [ "$1" == "" ]; then
     echo "You forgot an IP address prefix!"
-    echo "Syntax: ./scan_and_map.sh 192.168.1"
+    echo "Syntax: ./scan_and_map.sh 192.168.1  (or a CIDR like 10.0.0.0/22)"
     exit 1
 fi
 
-echo "--- 🔍 STEP 1: Starting IP Sweep on $1.1-254 ---"
+echo "--- 🔍 STEP 1: Starting IP Sweep on $1 ---"
 # Run the sweep and save the found IP addresses to iplist.txt
-for ip in $(seq 1 254); do
-    ping -c 1 $1.$ip | grep "64 bytes" | cut -d " " -f 4 | tr -d ":"
-done > iplist.txt
+# (sweep.py accepts the old prefix form as well as CIDRs and ranges, and pings concurrently)
+rm -f iplist.txt
+python3 "$(dirname "$0")/sweep.py" "$1" iplist.txt || exit 1
 echo "--- ✅ Found IPs saved to iplist.txt ---"
 
 echo ""
@@ -25,14 +25,12 @@ if [ ! -s iplist.txt ]; then
 fi
 
 echo "--- 🔎 STEP 2: Starting Nmap scan for port 80 on listed hosts ---"
-echo "--- Results will be displayed as they complete. ---"
+echo "--- Hosts are sharded across a bounded pool of Nmap processes. ---"
 
-# Loop through each IP in the file and run an Nmap scan
-for ip in $(cat iplist.txt); do 
-    nmap -p 80 -T4 $ip & 
-done
-
-# Wait for all background Nmap processes to finish before exiting the script
-wait
+# Scan the hosts with at most 8 concurrent Nmap processes (instead of one per host).
+# --restart because every run of this script starts from a fresh sweep.
+python3 "$(dirname "$0")/scan_ip_list.py" iplist.txt -o port80_scan.txt \
+    --nmap-options "-p 80 -T4" --workers 8 --shard-size 16 --restart || exit 1
+cat port80_scan.txt
 
 echo "--- ✅ Nmap scanning complete. ---"
\ No newline at end of file
@@ -0,0 +1,123 @@
+#!/usr/bin/python3
+"""Streaming ingester for nmap -oX output.
+
+iter_hosts() walks the document with iterparse and yields one plain dict
+per <host>, clearing parsed elements as it goes, so memory stays flat no
+matter how large the file is. Records can be written as JSON lines or
+loaded into the sweep_scan result store.
+"""
+import argparse
+import json
+import sys
+import xml.etree.ElementTree as ET
+
+from result_store import ResultStore
+
+
+def _port_record(port):
+    state = port.find("state")
+    service = port.find("service")
+    record = {
+        "port": int(port.get("portid")),
+        "protocol": port.get("protocol"),
+        "state": state.get("state") if state is not None else None,
+        "service": None,
+    }
+    if service is not None:
+        record["service"] = service.get("name")
+        for key in ("product", "version", "extrainfo", "tunnel"):
+            if service.get(key):
+                record[key] = service.get(key)
+    return record
+
+
+def _host_record(host):
+    record = {"ip": None, "mac": None, "vendor": None, "status": None,
+              "hostnames": [], "ports": [], "os": []}
+    status = host.find("status")
+    if status is not None:
+        record["status"] = status.get("state")
+    for address in host.iter("address"):
+        if address.get("addrtype") in ("ipv4", "ipv6"):
+            record["ip"] = address.get("addr")
+        elif address.get("addrtype") == "mac":
+            record["mac"] = address.get("addr")
+            record["vendor"] = address.get("vendor")
+    record["hostnames"] = [h.get("name") for h in host.iter("hostname")]
+    record["ports"] = [_port_record(p) for p in host.iter("port")]
+    record["os"] = [{"name": m.get("name"), "accuracy": int(m.get("accuracy", 0))}
+                    for m in host.iter("osmatch")]
+    return record
+
+
+def iter_hosts(source):
+    """Yield one host record per <host> element in an nmap XML file or stream"""
+    context = ET.iterparse(source, events=("start", "end"))
+    root = None
+    for event, elem in context:
+        if root is None:
+            root = elem
+        if event == "end" and elem.tag == "host":
+            yield _host_record(elem)
+            # Drop everything parsed so far; the root would otherwise keep every host alive
+            root.clear()
+
+
+def write_jsonl(records, stream):
+    count = 0
+    for record in records:
+        stream.write(json.dumps(record) + "\n")
+        count += 1
+    return count
+
+
+def store_record(record, store):
+    """Record one host's status and TCP port states in the result store.
+
+    The store keys ports by (ip, port) only, so UDP results are skipped.
+    """
+    if not record["ip"]:
+        return
+    if record["status"]:
+        store.record_host(record["ip"], record["status"])
+    for port in record["ports"]:
+        if port["protocol"] == "tcp" and port["state"]:
+            store.record_port(record["ip"], port["port"], port["state"], port["service"])
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description='Convert nmap -oX output into JSON lines and/or the result store.')
+    parser.add_argument('xml_file', help="nmap XML file ('-' for stdin)")
+    parser.add_argument('--jsonl', metavar='FILE',
+                        help="Where to write JSON lines ('-' for stdout; the default unless --db is given)")
+    parser.add_argument('--db', metavar='FILE', help='Load results into this SQLite result store')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = parse_arguments()
+    source = sys.stdin.buffer if args.xml_file == '-' else args.xml_file
+    store = ResultStore(args.db) if args.db else None
+    jsonl = args.jsonl or (None if store else '-')
+
+    def records():
+        # Each host goes to the store as it is parsed, then on to the JSONL writer
+        for record in iter_hosts(source):
+            if store:
+                store_record(record, store)
+            yield record
+
+    try:
+        if jsonl:
+            out = sys.stdout if jsonl == '-' else open(jsonl, 'w')
+            try:
+                count = write_jsonl(records(), out)
+            finally:
+                if out is not sys.stdout:
+                    out.close()
+        else:
+            count = sum(1 for _ in records())
+    finally:
+        if store:
+            store.close()
+    print(f"[+] Processed {count} host record(s)", file=sys.stderr)
@@ -0,0 +1,179 @@
+#!/usr/bin/python3
+"""Token-bucket probe pacing shared by the sweep, scan and audit tools.
+
+Every probe engine asks the limiter for permission before sending. The
+limiter enforces a global packets-per-second rate with a burst allowance,
+an optional per-/24 rate so one small gateway never absorbs the whole
+budget, and loss-driven backoff: when the share of timed-out probes jumps
+above its running baseline the rate is halved, then recovers additively.
+A cut that does not bring loss down means the loss is not ours (a dark or
+firewalled range), so that level becomes the new baseline.
+"""
+import argparse
+import asyncio
+import threading
+import time
+
+DEFAULT_PPS = 5000
+DEFAULT_BURST = 256
+
+# Probes per feedback window and how far above baseline loss counts as a spike
+LOSS_WINDOW = 200
+LOSS_SPIKE = 0.15
+MIN_PPS = 10
+
+
+class TokenBucket:
+    """Token bucket implemented as a reservation clock (GCRA).
+
+    reserve() returns the time at which the caller may send; the token is
+    taken immediately so concurrent callers are spaced correctly.
+    """
+
+    def __init__(self, rate, burst):
+        self.burst = max(1, burst)
+        self.set_rate(rate)
+        self._tat = 0.0  # theoretical arrival time of the next token
+
+    def set_rate(self, rate):
+        self.rate = rate
+        self._interval = 1.0 / rate
+        self._tolerance = (self.burst - 1) * self._interval
+
+    def reserve(self, now):
+        tat = max(self._tat, now)
+        send_at = max(now, tat - self._tolerance)
+        self._tat = tat + self._interval
+        return send_at
+
+
+class RateLimiter:
+    """Thread- and asyncio-friendly pacing layer.
+
+    pps=None (or 0) disables the global limit; subnet_pps=None disables
+    per-/24 fairness.
+    """
+
+    def __init__(self, pps=DEFAULT_PPS, burst=DEFAULT_BURST, subnet_pps=None,
+                 subnet_burst=None, backoff=True):
+        self.target_pps = pps or None
+        self.subnet_pps = subnet_pps or None
+        self.subnet_burst = subnet_burst or max(1, burst // 4)
+        self.backoff = backoff
+        self._global = TokenBucket(pps, burst) if self.target_pps else None
+        self._subnets = {}
+        self._lock = threading.Lock()
+        self._sent = 0
+        self._lost = 0
+        self._baseline = None
+        self._cut_at = 0.0       # monotonic time of the latest rate cut
+        self._cut_loss = None    # loss ratio that caused it, until a window after it is judged
+
+    @property
+    def pps(self):
+        return self._global.rate if self._global else None
+
+    def _subnet_delay(self, ip):
+        """Take the per-/24 token for one probe to ip and return the delay before it is due"""
+        if not self.subnet_pps:
+            return 0.0
+        now = time.monotonic()
+        subnet = ip.rsplit('.', 1)[0]
+        with self._lock:
+            bucket = self._subnets.get(subnet)
+            if bucket is None:
+                bucket = self._subnets[subnet] = TokenBucket(self.subnet_pps, self.subnet_burst)
+            return bucket.reserve(now) - now
+
+    def _global_delay(self):
+        """Take the global token for a probe that is due now and return the delay before sending"""
+        if not self._global:
+            return 0.0
+        now = time.monotonic()
+        with self._lock:
+            return self._global.reserve(now) - now
+
+    def wait(self, ip):
+        """Block the calling thread until a probe to ip may be sent"""
+        delay = self._subnet_delay(ip)
+        if delay > 0:
+            time.sleep(delay)
+        # The global token is only taken once the subnet slot has come round, so a backlogged
+        # /24 waits on its own bucket without using up global budget ahead of other subnets
+        delay = self._global_delay()
+        if delay > 0:
+            time.sleep(delay)
+
+    async def wait_async(self, ip):
+        """Coroutine version of wait() for the asyncio engines"""
+        delay = self._subnet_delay(ip)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        delay = self._global_delay()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def record(self, lost, sent_at=None):
+        """Feed one probe outcome (lost=True for a timeout) into the backoff loop.
+
+        sent_at is the time.monotonic() the probe went out; outcomes of probes sent
+        before the latest cut say nothing about the new rate and are ignored.
+        """
+        if not (self.backoff and self._global):
+            return
+        with self._lock:
+            if sent_at is not None and sent_at < self._cut_at:
+                return
+            self._sent += 1
+            self._lost += lost
+            if self._sent < LOSS_WINDOW:
+                return
+            ratio = self._lost / self._sent
+            self._sent = self._lost = 0
+
+            if self._baseline is None:
+                self._baseline = ratio
+            elif self._cut_loss is not None and ratio > self._cut_loss - LOSS_SPIKE / 2:
+                # Halving did not reduce loss, so we were not overrunning anything: the
+                # targets simply stopped answering. Take that as the new normal and recover.
+                self._baseline = ratio
+                self._cut_loss = None
+            elif ratio > self._baseline + LOSS_SPIKE:
+                # Timeouts spiked: assume we are overrunning something and halve the rate
+                self._global.set_rate(max(MIN_PPS, self._global.rate / 2))
+                self._cut_at = time.monotonic()
+                self._cut_loss = ratio
+                return
+            else:
+                self._baseline = 0.9 * self._baseline + 0.1 * ratio
+                self._cut_loss = None
+            if self._global.rate < self.target_pps:
+                self._global.set_rate(min(self.target_pps, self._global.rate + self.target_pps / 10))
+
+
+def non_negative_int(value):
+    """argparse type for rates: an integer >= 0"""
+    number = int(value)
+    if number < 0:
+        raise argparse.ArgumentTypeError(f"must be 0 or more, got {value}")
+    return number
+
+
+def add_pacing_arguments(parser, pps=DEFAULT_PPS, burst=DEFAULT_BURST, subnet_pps=None):
+    """Add the shared --pps/--burst/--subnet-pps options to an argparse parser.
+
+    The keyword arguments let each tool pick defaults suited to its probes.
+    """
+    parser.add_argument('--pps', type=non_negative_int, default=pps,
+                        help=f'Maximum probes per second, 0 for unlimited (default: {pps})')
+    parser.add_argument('--burst', type=int, default=burst,
+                        help=f'Probes allowed back-to-back before pacing kicks in (default: {burst})')
+    parser.add_argument('--subnet-pps', type=non_negative_int, default=subnet_pps,
+                        help=f'Maximum probes per second to any single /24 (default: {subnet_pps or "no limit"})')
+    parser.add_argument('--no-backoff', action='store_true',
+                        help='Do not cut the rate when timeouts spike')
+
+
+def limiter_from_args(args):
+    return RateLimiter(pps=args.pps, burst=args.burst, subnet_pps=args.subnet_pps,
+                       backoff=not args.no_backoff)
@@ -0,0 +1,57 @@
+#!/usr/bin/python3
+"""Streaming output sinks for scan results.
+
+Each sink is a callable taking one result tuple; records are written and
+flushed immediately so the output can be piped into other tools while the
+scan is still running. A path of '-' writes to stdout.
+"""
+import csv
+import json
+import sys
+
+FIELDS = ["ip", "port", "state", "latency"]
+
+
+class _StreamSink:
+    def __init__(self, path):
+        self._owned = path != '-'
+        self.stream = open(path, 'w', newline='') if self._owned else sys.stdout
+
+    def close(self):
+        if self._owned:
+            self.stream.close()
+        else:
+            try:
+                self.stream.flush()
+            except BrokenPipeError:
+                pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class JsonlSink(_StreamSink):
+    """One JSON object per line"""
+
+    def __call__(self, result):
+        record = dict(zip(FIELDS, result))
+        record["latency"] = round(record["latency"], 6)
+        self.stream.write(json.dumps(record) + "\n")
+        self.stream.flush()
+
+
+class CsvSink(_StreamSink):
+    """CSV with a header row"""
+
+    def __init__(self, path):
+        super().__init__(path)
+        self._writer = csv.writer(self.stream)
+        self._writer.writerow(FIELDS)
+
+    def __call__(self, result):
+        ip, port, state, latency = result
+        self._writer.writerow([ip, port, state, f"{latency:.6f}"])
+        self.stream.flush()
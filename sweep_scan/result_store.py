@@ -0,0 +1,232 @@
+#!/usr/bin/python3
+"""SQLite-backed store of sweep/scan results for incremental rescans.
+
+Hosts are keyed by IP and ports by (IP, port). Each row keeps its current
+state plus first_seen/last_seen (first and latest time it was up/open),
+last_probed and last_changed. With a --since cutoff the tools only
+reprobe entries that are unknown, stale (last probed before the cutoff)
+or changed on their latest probe.
+"""
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+UP, DOWN = "up", "down"
+LIVE_STATES = (UP, "open")
+# last_changed value for rows whose state has not changed since first recorded
+NEVER_CHANGED = 0
+
+# Writes are committed in batches rather than per row
+COMMIT_EVERY = 1000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS hosts (
+    ip           TEXT PRIMARY KEY,
+    state        TEXT NOT NULL,
+    first_seen   REAL,
+    last_seen    REAL,
+    last_probed  REAL NOT NULL,
+    last_changed REAL NOT NULL,
+    last_scanned REAL
+);
+CREATE TABLE IF NOT EXISTS ports (
+    ip           TEXT NOT NULL,
+    port         INTEGER NOT NULL,
+    state        TEXT NOT NULL,
+    service      TEXT,
+    first_seen   REAL,
+    last_seen    REAL,
+    last_probed  REAL NOT NULL,
+    last_changed REAL NOT NULL,
+    PRIMARY KEY (ip, port)
+);
+CREATE TABLE IF NOT EXISTS fingerprints (
+    ip           TEXT NOT NULL,
+    port         INTEGER NOT NULL,
+    banner_hash  TEXT NOT NULL,
+    service      TEXT,
+    version      TEXT,
+    tls          INTEGER NOT NULL,
+    updated      REAL NOT NULL,
+    PRIMARY KEY (ip, port, banner_hash)
+);
+CREATE TABLE IF NOT EXISTS tls_results (
+    ip           TEXT NOT NULL,
+    port         INTEGER NOT NULL,
+    cert_sha256  TEXT NOT NULL,
+    mode         TEXT NOT NULL,
+    config       TEXT NOT NULL,
+    result       TEXT NOT NULL,
+    checked      REAL NOT NULL,
+    PRIMARY KEY (ip, port, cert_sha256, mode)
+);
+"""
+
+DURATION_RE = re.compile(r'^(\d+(?:\.\d+)?)\s*([smhdw])$', re.IGNORECASE)
+DURATION_UNITS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400, 'w': 604800}
+
+
+def parse_duration(spec):
+    """Parse '90s', '30m', '12h', '7d' or '2w' into seconds"""
+    match = DURATION_RE.match(spec.strip())
+    if not match:
+        raise ValueError(f"invalid duration: {spec}")
+    return float(match.group(1)) * DURATION_UNITS[match.group(2).lower()]
+
+
+def parse_since(spec):
+    """Turn a --since value (duration ago or ISO date/time) into a Unix timestamp"""
+    try:
+        return time.time() - parse_duration(spec)
+    except ValueError:
+        pass
+    try:
+        return datetime.fromisoformat(spec.strip()).timestamp()
+    except ValueError:
+        raise ValueError(f"--since expects a duration like 24h/7d or an ISO date, got: {spec}")
+
+
+class ResultStore:
+    """Thread-safe wrapper around the results database"""
+
+    def __init__(self, path):
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript(SCHEMA)
+        self._lock = threading.Lock()
+        self._pending = 0
+
+    def close(self):
+        with self._lock:
+            self._db.commit()
+            self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _write(self, sql, params):
+        with self._lock:
+            self._db.execute(sql, params)
+            self._pending += 1
+            if self._pending >= COMMIT_EVERY:
+                self._db.commit()
+                self._pending = 0
+
+    def record_host(self, ip, state, when=None):
+        when = when or time.time()
+        seen = when if state in LIVE_STATES else None
+        self._write("""
+            INSERT INTO hosts (ip, state, first_seen, last_seen, last_probed, last_changed)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT(ip) DO UPDATE SET
+                last_changed = CASE WHEN state != excluded.state
+                                    THEN excluded.last_probed ELSE last_changed END,
+                state = excluded.state,
+                first_seen = COALESCE(first_seen, excluded.first_seen),
+                last_seen = COALESCE(excluded.last_seen, last_seen),
+                last_probed = excluded.last_probed
+        """, (ip, state, seen, seen, when, NEVER_CHANGED))
+
+    def record_port(self, ip, port, state, service=None, when=None):
+        when = when or time.time()
+        seen = when if state in LIVE_STATES else None
+        self._write("""
+            INSERT INTO ports (ip, port, state, service, first_seen, last_seen, last_probed, last_changed)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(ip, port) DO UPDATE SET
+                last_changed = CASE WHEN state != excluded.state
+                                    THEN excluded.last_probed ELSE last_changed END,
+                state = excluded.state,
+                service = COALESCE(excluded.service, service),
+                first_seen = COALESCE(first_seen, excluded.first_seen),
+                last_seen = COALESCE(excluded.last_seen, last_seen),
+                last_probed = excluded.last_probed
+        """, (ip, port, state, service, seen, seen, when, NEVER_CHANGED))
+
+    def mark_scanned(self, ip, when=None):
+        """Record that a full service scan (nmap) of ip completed"""
+        when = when or time.time()
+        self._write("""
+            INSERT INTO hosts (ip, state, first_seen, last_seen, last_probed, last_changed, last_scanned)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(ip) DO UPDATE SET last_scanned = excluded.last_scanned
+        """, (ip, UP, when, when, when, NEVER_CHANGED, when))
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            return self._db.execute(sql, params).fetchall()
+
+    def host_needs_probe(self, ip, cutoff):
+        """True if ip is unknown, last probed before cutoff, or changed on its last probe"""
+        row = self._query("SELECT last_probed, last_changed FROM hosts WHERE ip = ?", (ip,))
+        if not row:
+            return True
+        last_probed, last_changed = row[0]
+        return last_probed < cutoff or last_changed == last_probed
+
+    def port_needs_probe(self, ip, port, cutoff):
+        """Like host_needs_probe, but also reprobes ports whose host changed state since"""
+        row = self._query("""
+            SELECT p.last_probed, p.last_changed, h.last_changed
+            FROM ports p LEFT JOIN hosts h ON h.ip = p.ip
+            WHERE p.ip = ? AND p.port = ?
+        """, (ip, port))
+        if not row:
+            return True
+        last_probed, last_changed, host_changed = row[0]
+        return (last_probed < cutoff or last_changed == last_probed
+                or (host_changed is not None and host_changed > last_probed))
+
+    def host_needs_scan(self, ip, cutoff):
+        """True if ip was never fully scanned, was scanned before cutoff, or changed since"""
+        row = self._query("""
+            SELECT h.last_scanned, h.last_changed, MAX(p.last_changed)
+            FROM hosts h LEFT JOIN ports p ON p.ip = h.ip
+            WHERE h.ip = ?
+        """, (ip,))
+        if not row or row[0][0] is None:
+            return True
+        last_scanned, host_changed, port_changed = row[0]
+        return (last_scanned < cutoff or host_changed > last_scanned
+                or (port_changed is not None and port_changed > last_scanned))
+
+    def get_fingerprint(self, ip, port, banner_hash):
+        """Cached (service, version, tls) for a banner, or None"""
+        row = self._query("SELECT service, version, tls FROM fingerprints "
+                          "WHERE ip = ? AND port = ? AND banner_hash = ?", (ip, port, banner_hash))
+        return (row[0][0], row[0][1], bool(row[0][2])) if row else None
+
+    def put_fingerprint(self, ip, port, banner_hash, service, version, tls):
+        self._write("INSERT OR REPLACE INTO fingerprints VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (ip, port, banner_hash, service, version, int(tls), time.time()))
+
+    def get_tls_result(self, ip, port, cert_sha256, mode):
+        """Cached (config, result, checked) of a TLS audit for this certificate, or None"""
+        row = self._query("SELECT config, result, checked FROM tls_results "
+                          "WHERE ip = ? AND port = ? AND cert_sha256 = ? AND mode = ?",
+                          (ip, port, cert_sha256, mode))
+        return row[0] if row else None
+
+    def put_tls_result(self, ip, port, cert_sha256, mode, config, result, when=None):
+        self._write("INSERT OR REPLACE INTO tls_results VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (ip, port, cert_sha256, mode, config, result, when or time.time()))
+
+    def hosts_in_state(self, *states):
+        marks = ','.join('?' * len(states))
+        return [ip for (ip,) in self._query(f"SELECT ip FROM hosts WHERE state IN ({marks})", states)]
+
+    def open_ports(self, ip):
+        return self._query("SELECT port, service FROM ports WHERE ip = ? AND state = 'open' ORDER BY port", (ip,))
+
+
+def add_store_arguments(parser):
+    """Add the shared --db/--since options to an argparse parser"""
+    parser.add_argument('--db', metavar='FILE',
+                        help='SQLite result store to record results in')
+    parser.add_argument('--since', metavar='WHEN',
+                        help='Incremental mode: only reprobe entries that are unknown, changed, or '
+                             'older than WHEN (e.g. 24h, 7d, 2025-11-01); requires --db')
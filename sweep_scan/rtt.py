@@ -0,0 +1,73 @@
+#!/usr/bin/python3
+"""Per-host round-trip time estimation for adaptive probe timeouts.
+
+The estimator follows TCP's retransmission timer (RFC 6298): a smoothed
+RTT (SRTT) and an RTT variance (RTTVAR) are updated from every measured
+sample, and the timeout is SRTT + 4 * RTTVAR, clamped to [min, max].
+"""
+import threading
+
+ALPHA = 1 / 8   # SRTT gain
+BETA = 1 / 4    # RTTVAR gain
+K = 4           # variance multiplier
+
+DEFAULT_INITIAL_TIMEOUT = 1.0
+DEFAULT_MIN_TIMEOUT = 0.05
+DEFAULT_MAX_TIMEOUT = 3.0
+
+
+class RTTEstimator:
+    """SRTT/RTTVAR state for a single host"""
+
+    __slots__ = ('srtt', 'rttvar')
+
+    def __init__(self, sample):
+        self.srtt = sample
+        self.rttvar = sample / 2
+
+    def update(self, sample):
+        self.rttvar = (1 - BETA) * self.rttvar + BETA * abs(self.srtt - sample)
+        self.srtt = (1 - ALPHA) * self.srtt + ALPHA * sample
+
+    def rto(self):
+        return self.srtt + K * self.rttvar
+
+
+class HostRTTTable:
+    """Thread-safe map of host -> RTTEstimator, shared by all probe engines.
+
+    Hosts without a sample yet get `initial` as their timeout; the first
+    successful connect (or refused connect, or ping reply) seeds the estimate.
+    """
+
+    def __init__(self, initial=DEFAULT_INITIAL_TIMEOUT, minimum=DEFAULT_MIN_TIMEOUT,
+                 maximum=DEFAULT_MAX_TIMEOUT):
+        self.initial = initial
+        self.minimum = minimum
+        self.maximum = maximum
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    def record(self, host, sample):
+        """Feed a measured round-trip time (seconds) for host"""
+        with self._lock:
+            estimator = self._hosts.get(host)
+            if estimator is None:
+                self._hosts[host] = RTTEstimator(sample)
+            else:
+                estimator.update(sample)
+
+    def timeout(self, host):
+        """Return the timeout to use for the next probe to host"""
+        estimator = self._hosts.get(host)
+        if estimator is None:
+            return self.initial
+        return min(self.maximum, max(self.minimum, estimator.rto()))
+
+    def srtt(self, host):
+        """Smoothed RTT for host, or None if it has not been measured"""
+        estimator = self._hosts.get(host)
+        return estimator.srtt if estimator else None
+
+    def __contains__(self, host):
+        return host in self._hosts
@@ -0,0 +1,213 @@
+#!/usr/bin/python3
+"""asyncio TCP connect-scan engine shared by the sweep_scan tools."""
+import asyncio
+import errno
+import queue
+import socket
+import threading
+from collections import defaultdict, namedtuple
+from rtt import HostRTTTable, DEFAULT_INITIAL_TIMEOUT
+from pacing import RateLimiter
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Global number of connects allowed in flight at once (further capped by the open-file limit)
+MAX_CONCURRENCY = 2000
+# Descriptors left free for stdio, sinks, the result store and the event loop itself
+FD_HEADROOM = 64
+# Results iter_scan lets pile up (in flight or unread) before pausing for its consumer
+RESULT_BUFFER = 8192
+# Connects allowed in flight against a single host
+PER_HOST_CONCURRENCY = 64
+# Timeout for hosts with no RTT sample yet; later probes adapt to the measured RTT
+DEFAULT_TIMEOUT = DEFAULT_INITIAL_TIMEOUT
+
+OPEN, CLOSED, FILTERED = "open", "closed", "filtered"
+# No probe could be sent (out of sockets); says nothing about the port
+ERROR = "error"
+
+ScanResult = namedtuple("ScanResult", ["ip", "port", "state", "latency"])
+
+
+def fd_limited_concurrency(wanted):
+    """Cap a connect concurrency to what RLIMIT_NOFILE allows, raising the soft limit if possible"""
+    if resource is None:
+        return wanted
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    needed = wanted + FD_HEADROOM
+    if soft != resource.RLIM_INFINITY and soft < needed:
+        target = needed if hard == resource.RLIM_INFINITY else min(needed, hard)
+        try:
+            resource.setrlimit(resource.RLIMIT_NOFILE, (target, hard))
+            soft = target
+        except (ValueError, OSError):
+            pass
+    if soft == resource.RLIM_INFINITY:
+        return wanted
+    return max(1, min(wanted, soft - FD_HEADROOM))
+
+
+class PortScanEngine:
+    """Keeps thousands of non-blocking connect() probes in flight from one thread."""
+
+    def __init__(self, max_concurrency=MAX_CONCURRENCY, per_host=PER_HOST_CONCURRENCY,
+                 timeout=DEFAULT_TIMEOUT, rtt=None, limiter=None):
+        self.max_concurrency = fd_limited_concurrency(max_concurrency)
+        self.per_host = per_host
+        self.rtt = rtt if rtt is not None else HostRTTTable(initial=timeout)
+        self.limiter = limiter if limiter is not None else RateLimiter()
+        self._host_slots = None
+
+    async def probe(self, ip, port):
+        """Connect to one ip:port and return a ScanResult"""
+        loop = asyncio.get_running_loop()
+        async with self._host_slots[ip]:
+            await self.limiter.wait_async(ip)
+            timeout = self.rtt.timeout(ip)
+            sock = await self._open_socket(timeout)
+            if sock is None:
+                return ScanResult(ip, port, ERROR, 0.0)
+            start = loop.time()
+            try:
+                await asyncio.wait_for(loop.sock_connect(sock, (ip, port)), timeout)
+                state = OPEN
+            except ConnectionRefusedError:
+                # A RST is a full round trip too, so it still feeds the RTT estimate
+                state = CLOSED
+            except asyncio.TimeoutError:
+                state = FILTERED
+            except OSError as e:
+                # Host/network unreachable answers are as good as a timeout
+                state = CLOSED if e.errno == errno.ECONNRESET else FILTERED
+            finally:
+                sock.close()
+            latency = loop.time() - start
+            if state != FILTERED:
+                self.rtt.record(ip, latency)
+            self.limiter.record(state == FILTERED, sent_at=start)
+            return ScanResult(ip, port, state, latency)
+
+    async def _open_socket(self, wait):
+        """A non-blocking TCP socket, or None if none could be had within wait seconds.
+
+        Running out of descriptors (EMFILE/ENFILE) is usually brief: other probes
+        release theirs as they finish, so keep trying for a while.
+        """
+        deadline = asyncio.get_running_loop().time() + wait
+        while True:
+            try:
+                sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+                sock.setblocking(False)
+                return sock
+            except OSError as e:
+                if (e.errno not in (errno.EMFILE, errno.ENFILE, errno.ENOBUFS)
+                        or asyncio.get_running_loop().time() >= deadline):
+                    return None
+                await asyncio.sleep(0.05)
+
+    async def run(self, targets, on_result=None, credits=None):
+        """Probe every (ip, port) pair in targets, keeping at most max_concurrency in flight.
+
+        targets may be any iterable (including a lazy generator); it is consumed
+        only as fast as slots free up. Each result is passed to on_result as soon
+        as its probe completes. With credits (an asyncio.Semaphore) every probe
+        takes one before it starts, and the caller gives them back as it consumes
+        results.
+        """
+        self._host_slots = defaultdict(lambda: asyncio.Semaphore(self.per_host))
+
+        async def start(ip, port):
+            await credits.acquire()
+            return await self.probe(ip, port)
+
+        pending = set()
+        targets = iter(targets)
+        exhausted = False
+
+        while pending or not exhausted:
+            while not exhausted and len(pending) < self.max_concurrency:
+                try:
+                    ip, port = next(targets)
+                except StopIteration:
+                    exhausted = True
+                    break
+                pending.add(asyncio.ensure_future(start(ip, port) if credits else self.probe(ip, port)))
+
+            if not pending:
+                break
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if on_result:
+                    on_result(task.result())
+
+    def scan(self, targets):
+        """Blocking helper: scan all pairs and return the list of results"""
+        results = []
+        asyncio.run(self.run(targets, results.append))
+        return results
+
+    def iter_scan(self, targets, buffer=RESULT_BUFFER):
+        """Generator yielding each ScanResult as soon as its probe completes.
+
+        The event loop runs in a background thread so slow consumers (e.g. a
+        sink writing to a pipe) never distort probe timings. At most buffer
+        results are in flight or unread: past that, new probes wait for the
+        consumer instead of piling results up in memory. Closing the generator
+        (or Ctrl-C in the consumer) stops the scan.
+        """
+        buffer = max(buffer, self.max_concurrency)
+        # Credits keep the queue under buffer, so the loop thread never blocks on put()
+        results = queue.Queue(maxsize=buffer + 2)
+        done = object()
+        started = threading.Event()
+        running = {}
+
+        async def main():
+            running["loop"], running["task"] = asyncio.get_running_loop(), asyncio.current_task()
+            running["credits"] = asyncio.Semaphore(buffer)
+            started.set()
+            await self.run(targets, results.put_nowait, running["credits"])
+
+        def worker():
+            try:
+                asyncio.run(main())
+            except asyncio.CancelledError:
+                pass  # stopped by the consumer
+            except BaseException as e:
+                results.put_nowait(e)
+            finally:
+                started.set()
+                results.put_nowait(done)
+
+        def call_in_loop(callback):
+            try:
+                running["loop"].call_soon_threadsafe(callback)
+            except RuntimeError:
+                pass  # the loop has already finished
+
+        thread = threading.Thread(target=worker, daemon=True)
+        thread.start()
+        started.wait()
+        try:
+            while True:
+                item = results.get()
+                if item is done:
+                    break
+                if isinstance(item, BaseException):
+                    raise item
+                call_in_loop(running["credits"].release)
+                yield item
+        finally:
+            if thread.is_alive() and "task" in running:
+                call_in_loop(running["task"].cancel)
+            thread.join()
+
+
+def scan_ports(ip, ports, **engine_options):
+    """Return the sorted open ports of a single host"""
+    engine = PortScanEngine(**engine_options)
+    results = engine.scan((ip, port) for port in ports)
+    return sorted(r.port for r in results if r.state == OPEN)
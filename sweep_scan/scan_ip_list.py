@@ -1,8 +1,17 @@
 import sys, subprocess, os
 import argparse
+import hashlib
+import json
+import shutil
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from result_store import ResultStore, add_store_arguments, parse_since
+from nmap_xml import iter_hosts, write_jsonl, store_record
 
 # Configuration for Nmap
 NMAP_OPTIONS = "-sV -O -T4" # Service version, OS detection, aggressive timing
+DEFAULT_WORKERS = 4 # Concurrent Nmap processes
+DEFAULT_SHARD_SIZE = 32 # Hosts per Nmap process
 
 def load_ips_from_file(input_file):
     """Reads IPs from a file, one per line, and returns a list."""
@@ -18,34 +27,150 @@ def load_ips_from_file(input_file):
         print(f"[ERROR] Could not read file {input_file}: {e}")
         sys.exit(1)
 
-def run_nmap_scan(ip_list, output_file):
-    """Executes the Nmap command against the provided list of IPs."""
+def run_nmap_shard(ip_list, normal_file, xml_file, nmap_options=NMAP_OPTIONS):
+    """Runs one blocking Nmap process for a shard, writing -oN and -oX output."""
+    # Construct the command: nmap [OPTIONS] -oN [file] -oX [file] [IPs]
+    command = [
+        "nmap",
+        *nmap_options.split(),
+        "-oN", normal_file,
+        "-oX", xml_file,
+        *ip_list
+    ]
+    subprocess.run(command, check=True, stdout=subprocess.DEVNULL)
+
+def targets_digest(ip_list):
+    """Fingerprint of the host list a work directory belongs to (order and duplicates ignored)."""
+    return hashlib.sha256("\n".join(sorted(set(ip_list))).encode()).hexdigest()
+
+def load_progress(progress_file):
+    """Returns (completed shard records, set of hosts already scanned) from the progress log."""
+    shards, done = [], set()
+    if os.path.exists(progress_file):
+        with open(progress_file, 'r') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue # Torn last line from a crash
+                shards.append(record)
+                done.update(record["hosts"])
+    return shards, done
+
+def xml_output_path(output_file):
+    """Where the merged XML for output_file goes: report.txt -> report.xml, report.xml -> report.xml.xml"""
+    root, ext = os.path.splitext(output_file)
+    return output_file + ".xml" if ext.lower() == ".xml" else root + ".xml"
+
+def merge_reports(shards, output_file, xml_output):
+    """Concatenates the shard -oN reports and merges the shard -oX <host> elements into one document."""
+    with open(output_file, 'w') as out:
+        for record in shards:
+            with open(record["normal"], 'r') as f:
+                out.write(f"# ---- Shard {record['shard']} ({len(record['hosts'])} hosts) ----\n")
+                out.write(f.read())
+
+    with open(xml_output, 'wb') as out:
+        out.write(b'<?xml version="1.0" encoding="UTF-8"?>\n<nmaprun scanner="nmap" merged="true">\n')
+        for record in shards:
+            # Stream each shard so only one <host> element is held at a time
+            root = None
+            for event, elem in ET.iterparse(record["xml"], events=("start", "end")):
+                if root is None:
+                    root = elem
+                if event == "end" and elem.tag == "host":
+                    out.write(ET.tostring(elem))
+                    root.clear()
+        out.write(b'</nmaprun>\n')
+
+def run_nmap_scan(ip_list, output_file, workers=DEFAULT_WORKERS, shard_size=DEFAULT_SHARD_SIZE,
+                  nmap_options=NMAP_OPTIONS, restart=False, on_shard_done=None):
+    """Shards the IP list across a bounded pool of concurrent Nmap processes.
+
+    Each shard writes its own -oN/-oX files into <output>.shards/. Completed
+    shards are appended to progress.jsonl, so an interrupted run picks up
+    where it left off; progress made for a different host list is discarded.
+    When every host is done the shards are merged into output_file and
+    <output>.xml.
+    """
     if not ip_list:
         print("[!] The list of IPs is empty. Skipping Nmap.")
         return
 
-    print(f"\n[+] Starting Nmap scan on {len(ip_list)} host(s)...")
+    work_dir = output_file + ".shards"
+    progress_file = os.path.join(work_dir, "progress.jsonl")
+    targets_file = os.path.join(work_dir, "targets.sha256")
+    digest = targets_digest(ip_list)
+    if not restart and os.path.isdir(work_dir):
+        try:
+            with open(targets_file, 'r') as f:
+                restart = f.read().strip() != digest
+        except FileNotFoundError:
+            restart = True
+        if restart:
+            print("[!] Previous progress in this output's work directory was for a different host list; starting over")
+    if restart and os.path.isdir(work_dir):
+        shutil.rmtree(work_dir)
+    os.makedirs(work_dir, exist_ok=True)
+    with open(targets_file, 'w') as f:
+        f.write(digest + "\n")
+
+    shards, done = load_progress(progress_file)
+    remaining = [ip for ip in ip_list if ip not in done]
+    if done:
+        print(f"[+] Resuming: {len(ip_list) - len(remaining)} host(s) already scanned, {len(remaining)} to go")
 
+    first_id = max((r["shard"] for r in shards), default=-1) + 1
+    batches = [remaining[i:i + shard_size] for i in range(0, len(remaining), shard_size)]
+    print(f"\n[+] Starting Nmap scan on {len(remaining)} host(s) in {len(batches)} shard(s), {workers} at a time...")
+    print(f"[+] Command per shard: nmap {nmap_options} -oN <shard>.txt -oX <shard>.xml <hosts>")
+
+    failed = 0
+    executor = ThreadPoolExecutor(max_workers=workers)
     try:
-        # Construct the command: nmap [OPTIONS] -oN [file] [IPs]
-        command = [
-            "nmap",
-            *NMAP_OPTIONS.split(), 
-            "-oN", output_file,   
-            *ip_list              
-        ]
-        
-        print(f"[+] Command: {' '.join(command)}")
-
-        # Run Nmap as a blocking external process
-        subprocess.run(command, check=True)
-        
-        print(f"\n[SUCCESS] Nmap results saved to: {output_file}")
-        
-    except subprocess.CalledProcessError:
-        print("\n[ERROR] Nmap failed. Check the command and ensure you have permissions (e.g., run with 'sudo').")
+        with open(progress_file, 'a') as progress:
+            futures = {}
+            for shard_id, batch in enumerate(batches, first_id):
+                base = os.path.join(work_dir, f"shard_{shard_id:05d}")
+                record = {"shard": shard_id, "hosts": batch, "normal": base + ".txt", "xml": base + ".xml"}
+                futures[executor.submit(run_nmap_shard, batch, record["normal"], record["xml"], nmap_options)] = record
+
+            for future in as_completed(futures):
+                record = futures[future]
+                try:
+                    future.result()
+                except subprocess.CalledProcessError:
+                    failed += 1
+                    print(f"[ERROR] Shard {record['shard']} failed; it will be retried on the next run.")
+                    continue
+                # Record progress durably before moving on
+                progress.write(json.dumps(record) + "\n")
+                progress.flush()
+                os.fsync(progress.fileno())
+                shards.append(record)
+                if on_shard_done:
+                    on_shard_done(record)
+                print(f"[+] Shard {record['shard']} done ({len(record['hosts'])} host(s), "
+                      f"{len(shards)} shard(s) complete)")
+
+    except KeyboardInterrupt:
+        # Queued shards must not launch nmap; the running ones got the same Ctrl-C
+        executor.shutdown(cancel_futures=True)
+        raise
     except FileNotFoundError:
         print("\n[ERROR] Nmap command not found. Please ensure Nmap is installed and in your system PATH.")
+        return False
+    finally:
+        executor.shutdown()
+
+    if failed:
+        print(f"\n[ERROR] {failed} shard(s) failed. Check permissions (e.g., run with 'sudo') and re-run to resume.")
+        return False
+
+    xml_output = xml_output_path(output_file)
+    merge_reports(sorted(shards, key=lambda r: r["shard"]), output_file, xml_output)
+    print(f"\n[SUCCESS] Nmap results saved to: {output_file} (XML: {xml_output})")
+    return True
 
 def parse_arguments():
     """Handles command line arguments for the Nmap script."""
@@ -56,7 +181,19 @@ def parse_arguments():
 
     parser.add_argument('input_file', type=str, help='Path to the file containing one IP per line (e.g., live_ips.txt)')
     parser.add_argument('-o', '--output', type=str, required=True,
-                        help='Output file for Nmap results')
+                        help='Output file for Nmap results; the merged XML goes next to it '
+                             '(report.txt -> report.xml, report.xml -> report.xml.xml)')
+    parser.add_argument('-w', '--workers', type=int, default=DEFAULT_WORKERS,
+                        help=f'Number of concurrent Nmap processes (default: {DEFAULT_WORKERS})')
+    parser.add_argument('--shard-size', type=int, default=DEFAULT_SHARD_SIZE,
+                        help=f'Hosts per Nmap process (default: {DEFAULT_SHARD_SIZE})')
+    parser.add_argument('--nmap-options', type=str, default=NMAP_OPTIONS,
+                        help=f'Options passed to every Nmap process (default: "{NMAP_OPTIONS}")')
+    parser.add_argument('--restart', action='store_true',
+                        help='Discard progress from a previous interrupted run and start over')
+    parser.add_argument('--jsonl', type=str,
+                        help='Also write structured host/port/service/OS records as JSON lines')
+    add_store_arguments(parser)
     
     return parser.parse_args()
 
@@ -67,5 +204,40 @@ if __name__ == '__main__':
     # 2. Load IPs
     live_ips = load_ips_from_file(args.input_file)
 
+    store = ResultStore(args.db) if args.db else None
+    if args.since:
+        if not store:
+            print("[ERROR] --since requires --db")
+            sys.exit(1)
+        try:
+            cutoff = parse_since(args.since)
+        except ValueError as e:
+            print(f"[ERROR] {e}")
+            sys.exit(1)
+        # Incremental mode: skip hosts fully scanned since the cutoff that have not changed
+        total = len(live_ips)
+        live_ips = [ip for ip in live_ips if store.host_needs_scan(ip, cutoff)]
+        print(f"[+] Incremental mode: {len(live_ips)} of {total} host(s) are new, stale or changed")
+
+    def mark_shard_scanned(record):
+        # Load the shard's structured results, then stamp its hosts as fully scanned
+        for host in iter_hosts(record["xml"]):
+            store_record(host, store)
+        for ip in record["hosts"]:
+            store.mark_scanned(ip)
+
     # 3. Run Nmap Scan
-    run_nmap_scan(live_ips, args.output)
\ No newline at end of file
+    try:
+        completed = run_nmap_scan(live_ips, args.output, workers=args.workers, shard_size=args.shard_size,
+                                  nmap_options=args.nmap_options, restart=args.restart,
+                                  on_shard_done=mark_shard_scanned if store else None)
+        if completed and args.jsonl:
+            # Stream the merged XML; only one host is ever held in memory
+            with open(args.jsonl, 'w') as out:
+                count = write_jsonl(iter_hosts(xml_output_path(args.output)), out)
+            print(f"[+] Wrote {count} structured host record(s) to {args.jsonl}")
+    except KeyboardInterrupt:
+        print("\n[STOPPED] Scan interrupted. Re-run the same command to resume.")
+    finally:
+        if store:
+            store.close()
\ No newline at end of file
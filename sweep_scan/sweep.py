@@ -1,10 +1,20 @@
-import sys, subprocess, platform, os
+import sys, subprocess, platform, os, socket
+import argparse
+from itertools import islice
 from concurrent.futures import ThreadPoolExecutor
+from targets import TargetSet
+from icmp_sweep import icmp_sweep, IcmpUnavailable
+from pacing import RateLimiter, add_pacing_arguments, limiter_from_args
+from result_store import ResultStore, add_store_arguments, parse_since, UP, DOWN
+
+# Shared pacing for the ICMP engine and the subprocess fallback
+LIMITER = RateLimiter()
 
 # Check a single host for activity
 def check_host(ip):
     # choose correct ping flag for the OS
     ping_flag = "-n" if platform.system().lower().startswith("win") else "-c"
+    LIMITER.wait(ip)
     try:
         # increase timeout a bit and rely on returncode (works cross-platform)
         res = subprocess.run(["ping", ping_flag, "1", ip], timeout=1.5, capture_output=True, text=True, check=False)
@@ -14,29 +24,90 @@ def check_host(ip):
         pass
     return None
 
+# Guard against accidentally sweeping e.g. a /8
+MAX_HOSTS = 1 << 20
+
+def sweep_hosts(ips):
+    """Return live IPs, using the in-process ICMP engine when a socket is available"""
+    try:
+        return list(icmp_sweep(ips, limiter=LIMITER))
+    except IcmpUnavailable:
+        # No ICMP socket allowed: fall back to one ping process per address
+        print("ICMP socket unavailable, falling back to system ping...")
+        live_ips = []
+        ips = iter(ips)
+        with ThreadPoolExecutor(max_workers=50) as executor:
+            # Feed the pool in bounded batches so huge ranges never queue up at once
+            while batch := list(islice(ips, 1024)):
+                live_ips.extend(ip for ip in executor.map(check_host, batch) if ip)
+        return live_ips
+
+def parse_arguments():
+    """Command line options for the sweep"""
+    script = os.path.basename(sys.argv[0])
+    parser = argparse.ArgumentParser(
+        description='Ping sweep a prefix, CIDR or address range and write live hosts to a file.',
+        epilog=f"Example: python {script} 192.168.1 live_ips.txt\n"
+               f"         python {script} 10.0.0.0/16,172.16.5.1-80 live_ips.txt --exclude 10.0.99.0/24 --random",
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument('targets', help='Comma-separated targets: 192.168.1, CIDR, a.b.c.d-e.f.g.h, a.b.c.d-N')
+    parser.add_argument('output', help='File to write live IPs to')
+    parser.add_argument('--exclude', action='append', default=[],
+                        help='Comma-separated targets to skip (may be repeated)')
+    parser.add_argument('--random', action='store_true',
+                        help='Probe in a random order to spread load across subnets')
+    parser.add_argument('--max-hosts', type=int, default=MAX_HOSTS,
+                        help=f'Refuse target sets larger than this (default: {MAX_HOSTS})')
+    add_pacing_arguments(parser)
+    add_store_arguments(parser)
+    return parser.parse_args()
+
 if __name__ == '__main__':
-    # Basic argument check
-    if len(sys.argv) != 3:
-        script = os.path.basename(sys.argv[0])
-        print(f"Usage: python {script} <subnet_prefix> <output_filename>")
-        print(f"Example: python {script} 192.168.1 live_ips.txt")
+    args = parse_arguments()
+    LIMITER = limiter_from_args(args)
+    exclude = [spec for item in args.exclude for spec in item.split(',')]
+
+    try:
+        # Addresses are generated lazily from integer ranges, never materialised as a list
+        ips = TargetSet(args.targets.split(','), exclude=exclude,
+                        randomize=args.random, max_hosts=args.max_hosts)
+        cutoff = parse_since(args.since) if args.since else None
+    except (OSError, ValueError) as e:
+        print(f"Invalid target specification: {e}")
+        sys.exit(1)
+    if cutoff and not args.db:
+        print("--since requires --db")
         sys.exit(1)
+    print(f"Scanning {len(ips)} address(es) in {args.targets}...")
+
+    if not args.db:
+        live_ips = sweep_hosts(ips)
+    else:
+        store = ResultStore(args.db)
+        probed = []
 
-    subnet, filename = sys.argv[1], sys.argv[2]
-    
-    # Generate list of IPs to scan (1 to 254)
-    ips = [f"{subnet}.{addr}" for addr in range(1, 255)]
-    print(f"Scanning {subnet}.1 - {subnet}.254...")
+        def targets():
+            # Incremental mode skips hosts probed since the cutoff that did not change
+            for ip in ips:
+                if cutoff is None or store.host_needs_probe(ip, cutoff):
+                    probed.append(ip)
+                    yield ip
 
-    # Run checks concurrently using 50 workers
-    with ThreadPoolExecutor(max_workers=50) as executor:
-        # executor.map applies check_host to all IPs and returns results in order
-        live_ips = [ip for ip in executor.map(check_host, ips) if ip]
+        live_ips = sweep_hosts(targets())
+        alive = set(live_ips)
+        for ip in probed:
+            store.record_host(ip, UP if ip in alive else DOWN)
+        if cutoff:
+            print(f"Probed {len(probed)} stale/changed address(es), reused {len(ips) - len(probed)} from {args.db}")
+            probed = set(probed)
+            live_ips += [ip for ip in store.hosts_in_state(UP) if ip in ips and ip not in probed]
+        store.close()
 
     # Write results to file
     if live_ips:
-        with open(filename, "w") as f:
-            f.write('\n'.join(sorted(live_ips)) + '\n')
-        print(f"Successfully wrote {len(live_ips)} live IP(s) to {filename}")
+        with open(args.output, "w") as f:
+            f.write('\n'.join(sorted(live_ips, key=socket.inet_aton)) + '\n')
+        print(f"Successfully wrote {len(live_ips)} live IP(s) to {args.output}")
     else:
         print("No live hosts found.")
\ No newline at end of file
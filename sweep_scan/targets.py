@@ -0,0 +1,220 @@
+#!/usr/bin/python3
+"""Target and port specification parsing for the sweep_scan tools."""
+import bisect
+import ipaddress
+import random
+import socket
+
+# nmap's "fast scan" (-F) list: the 100 most frequently open TCP ports
+TOP_PORTS = [
+    7, 9, 13, 21, 22, 23, 25, 26, 37, 53, 79, 80, 81, 88, 106, 110, 111, 113,
+    119, 135, 139, 143, 144, 179, 199, 389, 427, 443, 444, 445, 465, 513, 514,
+    515, 543, 544, 548, 554, 587, 631, 646, 873, 990, 993, 995, 1025, 1026,
+    1027, 1028, 1029, 1110, 1433, 1720, 1723, 1755, 1900, 2000, 2001, 2049,
+    2121, 2717, 3000, 3128, 3306, 3389, 3986, 4899, 5000, 5009, 5051, 5060,
+    5101, 5190, 5357, 5432, 5631, 5666, 5800, 5900, 6000, 6001, 6646, 7070,
+    8000, 8008, 8009, 8080, 8081, 8443, 8888, 9100, 9999, 10000, 32768, 49152,
+    49153, 49154, 49155, 49156, 49157,
+]
+
+
+def top_ports(count):
+    """Return the `count` most common ports.
+
+    TOP_PORTS only holds the top 100; larger requests are padded with the
+    lowest port numbers not already listed (where most remaining services live).
+    """
+    ports = TOP_PORTS[:count]
+    if count > len(ports):
+        listed = set(ports)
+        extra = (p for p in range(1, 65536) if p not in listed)
+        ports += [p for _, p in zip(range(count - len(ports)), extra)]
+    return ports
+
+
+def parse_port_spec(spec):
+    """Parse a port spec like '1-1024,3306,8000-8100,top1000' into a list.
+
+    Order of first appearance is kept and duplicates are dropped.
+    Raises ValueError on malformed input.
+    """
+    ports = []
+    seen = set()
+
+    def add(port):
+        if not 1 <= port <= 65535:
+            raise ValueError(f"port out of range: {port}")
+        if port not in seen:
+            seen.add(port)
+            ports.append(port)
+
+    for item in spec.split(','):
+        item = item.strip().lower()
+        if not item:
+            continue
+        if item.startswith('top'):
+            for port in top_ports(int(item[3:])):
+                add(port)
+        elif '-' in item:
+            low, high = (int(p) for p in item.split('-', 1))
+            if low > high:
+                raise ValueError(f"invalid port range: {item}")
+            for port in range(low, high + 1):
+                add(port)
+        else:
+            add(int(item))
+
+    if not ports:
+        raise ValueError("empty port specification")
+    return ports
+
+
+def load_hosts_file(path):
+    """Read target specs from a file, one per line ('#' starts a comment)"""
+    with open(path, 'r') as f:
+        return [line.split('#', 1)[0].strip() for line in f if line.split('#', 1)[0].strip()]
+
+
+def parse_target_spec(spec, hosts_only=True):
+    """Parse one target spec into an inclusive (first, last) integer address range.
+
+    Accepted forms:
+        192.168.1.0/24          CIDR (network/broadcast skipped like ip_network.hosts())
+        10.0.0.5-10.0.3.20      full address range
+        192.168.1.10-50         last-octet range
+        192.168.1               legacy three-octet prefix (means .1-.254)
+        192.168.1.7, host.lan   single address or resolvable hostname
+
+    With hosts_only=False a CIDR covers its network and broadcast addresses
+    too (used for exclusions).
+    """
+    spec = spec.strip()
+    first, _, last = spec.partition('-')
+    try:
+        first = ipaddress.IPv4Address(first.strip()) if last and '/' not in spec else None
+    except ValueError:
+        first = None  # a hostname such as web-01.example.com
+    if first is not None:
+        if '.' not in last:
+            last = str(first).rsplit('.', 1)[0] + '.' + last.strip()
+        first, last = int(first), int(ipaddress.IPv4Address(last.strip()))
+        if first > last:
+            raise ValueError(f"invalid address range: {spec}")
+        return first, last
+
+    parts = spec.split('.')
+    if 1 < len(parts) < 4 and all(p.isdigit() for p in parts):
+        # Legacy prefix as accepted by sweep.py / ipsweep.sh
+        spec = '.'.join(parts + ['0'] * (4 - len(parts))) + f"/{8 * len(parts)}"
+
+    try:
+        network = ipaddress.IPv4Network(spec, strict=False)
+    except ValueError:
+        # Not an address: resolve it as a hostname
+        address = int(ipaddress.IPv4Address(socket.gethostbyname(spec)))
+        return address, address
+    first, last = int(network.network_address), int(network.broadcast_address)
+    if hosts_only and network.prefixlen < 31:
+        first, last = first + 1, last - 1
+    return first, last
+
+
+def merge_ranges(ranges):
+    """Sort and merge overlapping/adjacent inclusive ranges"""
+    merged = []
+    for first, last in sorted(ranges):
+        if merged and first <= merged[-1][1] + 1:
+            merged[-1][1] = max(merged[-1][1], last)
+        else:
+            merged.append([first, last])
+    return [tuple(r) for r in merged]
+
+
+def _random_permutation(size, rng):
+    """Lazily yield a pseudo-random permutation of range(size) in O(1) memory.
+
+    Uses a full-period linear congruential generator over the next power of
+    two (Hull-Dobell: c odd, a = 1 mod 4) and skips values >= size.
+    """
+    modulus = 1
+    while modulus < size:
+        modulus <<= 1
+    if modulus <= 2:
+        yield from rng.sample(range(size), size)
+        return
+    a = rng.randrange(modulus // 4) * 4 + 1
+    c = rng.randrange(modulus // 2) * 2 + 1
+    x = rng.randrange(modulus)
+    for _ in range(modulus):
+        x = (a * x + c) % modulus
+        if x < size:
+            yield x
+
+
+class TargetSet:
+    """Lazy, re-iterable set of IPv4 targets built from specs and exclusions.
+
+    Only merged integer ranges are kept in memory, so a /12 costs a few
+    tuples rather than a million strings. With randomize=True each pass
+    walks a pseudo-random permutation of the whole space, spreading probes
+    across subnets instead of hammering one /24 at a time.
+    """
+
+    def __init__(self, specs, exclude=(), randomize=False, seed=None, max_hosts=None):
+        self.ranges = merge_ranges(parse_target_spec(s) for s in specs)
+        self.excluded = merge_ranges(parse_target_spec(s, hosts_only=False) for s in exclude)
+        self.randomize = randomize
+        self.seed = seed if seed is not None else random.randrange(2 ** 32)
+        # Cumulative offsets let a flat index be mapped back to an address
+        self._offsets = []
+        total = 0
+        for first, last in self.ranges:
+            self._offsets.append(total)
+            total += last - first + 1
+        self._span = total
+        self._count = total - sum(self._overlap(first, last) for first, last in self.ranges)
+        if max_hosts is not None and self._count > max_hosts:
+            raise ValueError(f"{self._count} targets exceed the limit of {max_hosts}")
+
+    def _overlap(self, first, last):
+        """Number of excluded addresses inside [first, last]"""
+        return sum(max(0, min(last, x_last) - max(first, x_first) + 1)
+                   for x_first, x_last in self.excluded)
+
+    def _is_excluded(self, address):
+        i = bisect.bisect_right(self.excluded, (address, float('inf'))) - 1
+        return i >= 0 and self.excluded[i][0] <= address <= self.excluded[i][1]
+
+    def _address_at(self, index):
+        i = bisect.bisect_right(self._offsets, index) - 1
+        return self.ranges[i][0] + index - self._offsets[i]
+
+    def __len__(self):
+        return self._count
+
+    def __contains__(self, ip):
+        address = int(ipaddress.IPv4Address(ip))
+        i = bisect.bisect_right(self.ranges, (address, float('inf'))) - 1
+        return (i >= 0 and self.ranges[i][0] <= address <= self.ranges[i][1]
+                and not self._is_excluded(address))
+
+    def __iter__(self):
+        if self.randomize:
+            addresses = (self._address_at(i)
+                         for i in _random_permutation(self._span, random.Random(self.seed)))
+        else:
+            addresses = (a for first, last in self.ranges for a in range(first, last + 1))
+        for address in addresses:
+            if not self.excluded or not self._is_excluded(address):
+                yield str(ipaddress.IPv4Address(address))
+
+
+def interleave(hosts, ports):
+    """Yield the host x port cross product port-major.
+
+    Consecutive probes go to different hosts, so one slow or filtered host
+    only ever holds a small share of the in-flight slots.
+    """
+    for port in ports:
+        for host in hosts:
+            yield host, port
@@ -0,0 +1,286 @@
+#!/usr/bin/python3
+"""Raw TLS ClientHello probes that do not depend on the local OpenSSL.
+
+build_client_hello() writes a ClientHello offering exactly the cipher
+suite IDs given, at any protocol version from SSLv3 to TLS 1.2, and
+read_server_hello() reads the server's answer far enough to see which
+version and suite it picked (or that it sent an alert). No key exchange
+happens and the handshake is never completed, so a probe costs one round
+trip after the connect and works even when the local crypto policy has
+removed 3DES, RC4, export suites or SSLv3 altogether.
+"""
+import os
+import struct
+from collections import namedtuple
+
+SSL3, TLS10, TLS11, TLS12 = 0x0300, 0x0301, 0x0302, 0x0303
+VERSION_NAMES = {SSL3: "SSLv3", TLS10: "TLSv1", TLS11: "TLSv1.1", TLS12: "TLSv1.2"}
+VERSIONS = {name: version for version, name in VERSION_NAMES.items()}
+
+CONTENT_ALERT = 0x15
+CONTENT_HANDSHAKE = 0x16
+HANDSHAKE_CLIENT_HELLO = 0x01
+HANDSHAKE_SERVER_HELLO = 0x02
+# Signalling value standing in for the renegotiation_info extension
+EMPTY_RENEGOTIATION_INFO_SCSV = 0x00FF
+# Give up on a response that grows past this without containing a ServerHello
+MAX_RESPONSE = 32768
+
+ServerHello = namedtuple("ServerHello", ["version", "cipher_suite"])
+
+
+class TLSProbeError(Exception):
+    """The server's response is not TLS, or not a well-formed ServerHello."""
+
+
+# IANA cipher suite IDs by weak family
+SUITES_3DES = {
+    0x000A: "TLS_RSA_WITH_3DES_EDE_CBC_SHA",
+    0x000D: "TLS_DH_DSS_WITH_3DES_EDE_CBC_SHA",
+    0x0010: "TLS_DH_RSA_WITH_3DES_EDE_CBC_SHA",
+    0x0013: "TLS_DHE_DSS_WITH_3DES_EDE_CBC_SHA",
+    0x0016: "TLS_DHE_RSA_WITH_3DES_EDE_CBC_SHA",
+    0x001B: "TLS_DH_anon_WITH_3DES_EDE_CBC_SHA",
+    0x001F: "TLS_KRB5_WITH_3DES_EDE_CBC_SHA",
+    0x0023: "TLS_KRB5_WITH_3DES_EDE_CBC_MD5",
+    0x008B: "TLS_PSK_WITH_3DES_EDE_CBC_SHA",
+    0x008F: "TLS_DHE_PSK_WITH_3DES_EDE_CBC_SHA",
+    0x0093: "TLS_RSA_PSK_WITH_3DES_EDE_CBC_SHA",
+    0xC003: "TLS_ECDH_ECDSA_WITH_3DES_EDE_CBC_SHA",
+    0xC008: "TLS_ECDHE_ECDSA_WITH_3DES_EDE_CBC_SHA",
+    0xC00D: "TLS_ECDH_RSA_WITH_3DES_EDE_CBC_SHA",
+    0xC012: "TLS_ECDHE_RSA_WITH_3DES_EDE_CBC_SHA",
+    0xC017: "TLS_ECDH_anon_WITH_3DES_EDE_CBC_SHA",
+    0xC01A: "TLS_SRP_SHA_WITH_3DES_EDE_CBC_SHA",
+    0xC01B: "TLS_SRP_SHA_RSA_WITH_3DES_EDE_CBC_SHA",
+    0xC01C: "TLS_SRP_SHA_DSS_WITH_3DES_EDE_CBC_SHA",
+    0xC034: "TLS_ECDHE_PSK_WITH_3DES_EDE_CBC_SHA",
+}
+SUITES_RC4 = {
+    0x0004: "TLS_RSA_WITH_RC4_128_MD5",
+    0x0005: "TLS_RSA_WITH_RC4_128_SHA",
+    0x0018: "TLS_DH_anon_WITH_RC4_128_MD5",
+    0x0020: "TLS_KRB5_WITH_RC4_128_SHA",
+    0x0024: "TLS_KRB5_WITH_RC4_128_MD5",
+    0x008A: "TLS_PSK_WITH_RC4_128_SHA",
+    0x008E: "TLS_DHE_PSK_WITH_RC4_128_SHA",
+    0x0092: "TLS_RSA_PSK_WITH_RC4_128_SHA",
+    0xC002: "TLS_ECDH_ECDSA_WITH_RC4_128_SHA",
+    0xC007: "TLS_ECDHE_ECDSA_WITH_RC4_128_SHA",
+    0xC00C: "TLS_ECDH_RSA_WITH_RC4_128_SHA",
+    0xC011: "TLS_ECDHE_RSA_WITH_RC4_128_SHA",
+    0xC016: "TLS_ECDH_anon_WITH_RC4_128_SHA",
+    0xC033: "TLS_ECDHE_PSK_WITH_RC4_128_SHA",
+}
+SUITES_EXPORT = {
+    0x0003: "TLS_RSA_EXPORT_WITH_RC4_40_MD5",
+    0x0006: "TLS_RSA_EXPORT_WITH_RC2_CBC_40_MD5",
+    0x0008: "TLS_RSA_EXPORT_WITH_DES40_CBC_SHA",
+    0x000B: "TLS_DH_DSS_EXPORT_WITH_DES40_CBC_SHA",
+    0x000E: "TLS_DH_RSA_EXPORT_WITH_DES40_CBC_SHA",
+    0x0011: "TLS_DHE_DSS_EXPORT_WITH_DES40_CBC_SHA",
+    0x0014: "TLS_DHE_RSA_EXPORT_WITH_DES40_CBC_SHA",
+    0x0017: "TLS_DH_anon_EXPORT_WITH_RC4_40_MD5",
+    0x0019: "TLS_DH_anon_EXPORT_WITH_DES40_CBC_SHA",
+    0x0026: "TLS_KRB5_EXPORT_WITH_DES_CBC_40_SHA",
+    0x0027: "TLS_KRB5_EXPORT_WITH_RC2_CBC_40_SHA",
+    0x0028: "TLS_KRB5_EXPORT_WITH_RC4_40_SHA",
+    0x0029: "TLS_KRB5_EXPORT_WITH_DES_CBC_40_MD5",
+    0x002A: "TLS_KRB5_EXPORT_WITH_RC2_CBC_40_MD5",
+    0x002B: "TLS_KRB5_EXPORT_WITH_RC4_40_MD5",
+    0x0062: "TLS_RSA_EXPORT1024_WITH_DES_CBC_SHA",
+    0x0063: "TLS_DHE_DSS_EXPORT1024_WITH_DES_CBC_SHA",
+    0x0064: "TLS_RSA_EXPORT1024_WITH_RC4_56_SHA",
+    0x0065: "TLS_DHE_DSS_EXPORT1024_WITH_RC4_56_SHA",
+}
+SUITES_NULL = {
+    0x0001: "TLS_RSA_WITH_NULL_MD5",
+    0x0002: "TLS_RSA_WITH_NULL_SHA",
+    0x002C: "TLS_PSK_WITH_NULL_SHA",
+    0x002D: "TLS_DHE_PSK_WITH_NULL_SHA",
+    0x002E: "TLS_RSA_PSK_WITH_NULL_SHA",
+    0x003B: "TLS_RSA_WITH_NULL_SHA256",
+    0x00B0: "TLS_PSK_WITH_NULL_SHA256",
+    0x00B1: "TLS_PSK_WITH_NULL_SHA384",
+    0x00B4: "TLS_DHE_PSK_WITH_NULL_SHA256",
+    0x00B5: "TLS_DHE_PSK_WITH_NULL_SHA384",
+    0x00B8: "TLS_RSA_PSK_WITH_NULL_SHA256",
+    0x00B9: "TLS_RSA_PSK_WITH_NULL_SHA384",
+    0xC001: "TLS_ECDH_ECDSA_WITH_NULL_SHA",
+    0xC006: "TLS_ECDHE_ECDSA_WITH_NULL_SHA",
+    0xC00B: "TLS_ECDH_RSA_WITH_NULL_SHA",
+    0xC010: "TLS_ECDHE_RSA_WITH_NULL_SHA",
+    0xC015: "TLS_ECDH_anon_WITH_NULL_SHA",
+    0xC039: "TLS_ECDHE_PSK_WITH_NULL_SHA",
+    0xC03A: "TLS_ECDHE_PSK_WITH_NULL_SHA256",
+    0xC03B: "TLS_ECDHE_PSK_WITH_NULL_SHA384",
+}
+# Block-cipher suites an SSLv3 server can pick (3DES and export DES40/RC2 ones are added below)
+SUITES_CBC = {
+    0x0007: "TLS_RSA_WITH_IDEA_CBC_SHA",
+    0x0009: "TLS_RSA_WITH_DES_CBC_SHA",
+    0x0012: "TLS_DHE_DSS_WITH_DES_CBC_SHA",
+    0x0015: "TLS_DHE_RSA_WITH_DES_CBC_SHA",
+    0x002F: "TLS_RSA_WITH_AES_128_CBC_SHA",
+    0x0032: "TLS_DHE_DSS_WITH_AES_128_CBC_SHA",
+    0x0033: "TLS_DHE_RSA_WITH_AES_128_CBC_SHA",
+    0x0035: "TLS_RSA_WITH_AES_256_CBC_SHA",
+    0x0038: "TLS_DHE_DSS_WITH_AES_256_CBC_SHA",
+    0x0039: "TLS_DHE_RSA_WITH_AES_256_CBC_SHA",
+    0x0041: "TLS_RSA_WITH_CAMELLIA_128_CBC_SHA",
+    0x0045: "TLS_DHE_RSA_WITH_CAMELLIA_128_CBC_SHA",
+    0x0084: "TLS_RSA_WITH_CAMELLIA_256_CBC_SHA",
+    0x0088: "TLS_DHE_RSA_WITH_CAMELLIA_256_CBC_SHA",
+    0x0096: "TLS_RSA_WITH_SEED_CBC_SHA",
+    0xC009: "TLS_ECDHE_ECDSA_WITH_AES_128_CBC_SHA",
+    0xC00A: "TLS_ECDHE_ECDSA_WITH_AES_256_CBC_SHA",
+    0xC013: "TLS_ECDHE_RSA_WITH_AES_128_CBC_SHA",
+    0xC014: "TLS_ECDHE_RSA_WITH_AES_256_CBC_SHA",
+}
+SUITES_CBC.update(SUITES_3DES)
+SUITES_CBC.update({suite: name for suite, name in SUITES_EXPORT.items() if "CBC" in name})
+# TLS 1.2 AEAD and SHA-2 suites, offered first when probing which versions a server speaks
+SUITES_MODERN = {
+    0xC02B: "TLS_ECDHE_ECDSA_WITH_AES_128_GCM_SHA256",
+    0xC02C: "TLS_ECDHE_ECDSA_WITH_AES_256_GCM_SHA384",
+    0xC02F: "TLS_ECDHE_RSA_WITH_AES_128_GCM_SHA256",
+    0xC030: "TLS_ECDHE_RSA_WITH_AES_256_GCM_SHA384",
+    0xCCA8: "TLS_ECDHE_RSA_WITH_CHACHA20_POLY1305_SHA256",
+    0xCCA9: "TLS_ECDHE_ECDSA_WITH_CHACHA20_POLY1305_SHA256",
+    0x009C: "TLS_RSA_WITH_AES_128_GCM_SHA256",
+    0x009D: "TLS_RSA_WITH_AES_256_GCM_SHA384",
+    0x009E: "TLS_DHE_RSA_WITH_AES_128_GCM_SHA256",
+    0x009F: "TLS_DHE_RSA_WITH_AES_256_GCM_SHA384",
+    0xC023: "TLS_ECDHE_ECDSA_WITH_AES_128_CBC_SHA256",
+    0xC024: "TLS_ECDHE_ECDSA_WITH_AES_256_CBC_SHA384",
+    0xC027: "TLS_ECDHE_RSA_WITH_AES_128_CBC_SHA256",
+    0xC028: "TLS_ECDHE_RSA_WITH_AES_256_CBC_SHA384",
+    0x003C: "TLS_RSA_WITH_AES_128_CBC_SHA256",
+    0x003D: "TLS_RSA_WITH_AES_256_CBC_SHA256",
+    0x0067: "TLS_DHE_RSA_WITH_AES_128_CBC_SHA256",
+    0x006B: "TLS_DHE_RSA_WITH_AES_256_CBC_SHA256",
+}
+# Everything a real server might pick, for protocol-version probes
+SUITES_ANY = {**SUITES_MODERN, **SUITES_CBC, **SUITES_RC4}
+
+SUITE_NAMES = {**SUITES_ANY, **SUITES_EXPORT, **SUITES_NULL}
+
+CIPHER_FAMILIES = {
+    "3DES": list(SUITES_3DES),
+    "RC4": list(SUITES_RC4),
+    "EXPORT": list(SUITES_EXPORT),
+    "NULL": list(SUITES_NULL),
+    "CBC": list(SUITES_CBC),
+    "ANY": list(SUITES_ANY),
+}
+
+EXT_SERVER_NAME = 0x0000
+EXT_SUPPORTED_GROUPS = 0x000A
+EXT_EC_POINT_FORMATS = 0x000B
+EXT_SIGNATURE_ALGORITHMS = 0x000D
+# x25519, secp256r1, secp384r1, secp521r1
+SUPPORTED_GROUPS = [0x001D, 0x0017, 0x0018, 0x0019]
+# rsa_pkcs1 and ecdsa with SHA-256/384/512, rsa_pss_rsae, then the SHA-1 fallbacks
+SIGNATURE_ALGORITHMS = [0x0401, 0x0501, 0x0601, 0x0403, 0x0503, 0x0603,
+                        0x0804, 0x0805, 0x0806, 0x0201, 0x0203]
+
+
+def suite_name(suite):
+    return SUITE_NAMES.get(suite, f"0x{suite:04X}")
+
+
+def _extension(ext_type, body):
+    return struct.pack("!HH", ext_type, len(body)) + body
+
+
+def _u16_list(values):
+    return struct.pack(f"!H{len(values)}H", len(values) * 2, *values)
+
+
+def build_client_hello(version, cipher_suites, server_name=None):
+    """Return a ClientHello record offering exactly cipher_suites at version.
+
+    Extensions (SNI, EC groups, signature algorithms) are sent from TLS 1.0
+    up; an SSLv3 hello carries none, as SSLv3 servers may reject them.
+    """
+    body = struct.pack("!H", version) + os.urandom(32) + b"\x00"   # empty session id
+    body += _u16_list(list(cipher_suites) + [EMPTY_RENEGOTIATION_INFO_SCSV])
+    body += b"\x01\x00"                                            # null compression only
+
+    if version >= TLS10:
+        extensions = b""
+        if server_name:
+            name = server_name.encode("idna")
+            entry = b"\x00" + struct.pack("!H", len(name)) + name
+            extensions += _extension(EXT_SERVER_NAME, struct.pack("!H", len(entry)) + entry)
+        extensions += _extension(EXT_SUPPORTED_GROUPS, _u16_list(SUPPORTED_GROUPS))
+        extensions += _extension(EXT_EC_POINT_FORMATS, b"\x01\x00")
+        if version >= TLS12:
+            extensions += _extension(EXT_SIGNATURE_ALGORITHMS, _u16_list(SIGNATURE_ALGORITHMS))
+        body += struct.pack("!H", len(extensions)) + extensions
+
+    handshake = struct.pack("!B", HANDSHAKE_CLIENT_HELLO) + len(body).to_bytes(3, "big") + body
+    # Old servers choke on a record version above TLS 1.0, whatever the hello offers
+    record_version = min(version, TLS10)
+    return struct.pack("!BHH", CONTENT_HANDSHAKE, record_version, len(handshake)) + handshake
+
+
+def parse_server_hello(body):
+    """Parse the body of a ServerHello handshake message"""
+    try:
+        version = struct.unpack("!H", body[:2])[0]
+        session_id_length = body[34]
+        offset = 35 + session_id_length
+        cipher_suite = struct.unpack("!H", body[offset:offset + 2])[0]
+    except (struct.error, IndexError):
+        raise TLSProbeError("truncated ServerHello")
+    return ServerHello(version, cipher_suite)
+
+
+def read_server_hello(sock):
+    """Read records from sock until a ServerHello or an alert arrives.
+
+    Returns the ServerHello, or None if the server refused the offer with
+    an alert or by closing the connection. Raises TLSProbeError if the
+    response is not TLS.
+    """
+    buffer = b""
+    handshake = b""
+    while True:
+        while len(buffer) >= 5:
+            content_type, _, length = struct.unpack("!BHH", buffer[:5])
+            if content_type not in (CONTENT_ALERT, CONTENT_HANDSHAKE):
+                raise TLSProbeError(f"unexpected record type {content_type:#04x}")
+            if len(buffer) < 5 + length:
+                break
+            fragment, buffer = buffer[5:5 + length], buffer[5 + length:]
+            if content_type == CONTENT_ALERT:
+                return None
+            # A ServerHello may in theory span several records
+            handshake += fragment
+            if len(handshake) >= 4:
+                if handshake[0] != HANDSHAKE_SERVER_HELLO:
+                    raise TLSProbeError(f"unexpected handshake message {handshake[0]}")
+                length = int.from_bytes(handshake[1:4], "big")
+                if len(handshake) >= 4 + length:
+                    return parse_server_hello(handshake[4:4 + length])
+
+        chunk = sock.recv(4096)
+        if not chunk:
+            return None
+        buffer += chunk
+        if len(buffer) + len(handshake) > MAX_RESPONSE:
+            raise TLSProbeError("response too large")
+
+
+def hello_probe(sock, version, cipher_suites, server_name=None):
+    """Offer cipher_suites at version on a connected socket.
+
+    Returns the ServerHello if the server accepted one of the offered suites
+    at a version no higher than offered, otherwise None.
+    """
+    sock.sendall(build_client_hello(version, cipher_suites, server_name))
+    hello = read_server_hello(sock)
+    if hello is None or hello.version > version or hello.cipher_suite not in cipher_suites:
+        return None
+    return hello
@@ -3,14 +3,44 @@ import os
 import socket
 import ssl
 import re
+import argparse
+import csv
+import hashlib
+import io
+import json
+import queue
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from contextlib import closing
 import time
 import logging
+import logging.handlers
+import warnings
+from collections import namedtuple
+
+# Shared probe helpers live in the sweep_scan toolkit
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "sweep_scan"))
+from rtt import HostRTTTable
+from pacing import RateLimiter, add_pacing_arguments, limiter_from_args
+from targets import parse_port_spec
+from result_store import ResultStore, parse_duration
+import tls_hello
+from tls_hello import hello_probe, suite_name, TLSProbeError, CIPHER_FAMILIES, VERSION_NAMES
 
 # --- Configuration ---
 # Setting the SSL context to ONLY allow the weak 3DES cipher suites.
 WEAK_3DES_CIPHERS = "3DES" 
-TIMEOUT_SECONDS = 3
+TIMEOUT_SECONDS = 3 # Handshake timeout and connect timeout before a host's RTT is known
+MIN_CONNECT_TIMEOUT = 0.1
+# Connection pacing: each port check and TLS handshake costs one connect
+MAX_CONNECTS_PER_SECOND = 50
+CONNECT_BURST = 10
+MAX_CONNECTS_PER_SUBNET = 20
+# Hosts audited at once; the limiter, not the pool size, bounds the connect rate
+DEFAULT_WORKERS = 32
+# Results waiting to be printed in input order while an earlier host is still being probed
+REORDER_WINDOW_PER_WORKER = 4
+# Ports audited by --matrix when no --ports are given: HTTPS and the implicit-TLS mail/directory/DNS services
+DEFAULT_TLS_PORTS = "443,8443,993,995,465,636,853,989,990,992,994,3269,5061"
 
 # List of SSL/TLS protocol contexts to test for maximum coverage (Reintroducing the advanced check)
 PROTOCOL_CONTEXTS = [
@@ -19,23 +49,162 @@ PROTOCOL_CONTEXTS = [
     ssl.PROTOCOL_TLSv1_1, 
 ]
 
+# --- Full posture enumeration (--enumerate) ---
+# (name, version, whether the local OpenSSL can speak it), oldest first
+PROTOCOL_VERSIONS = [
+    ("SSLv3", ssl.TLSVersion.SSLv3, ssl.HAS_SSLv3),
+    ("TLSv1", ssl.TLSVersion.TLSv1, ssl.HAS_TLSv1),
+    ("TLSv1.1", ssl.TLSVersion.TLSv1_1, ssl.HAS_TLSv1_1),
+    ("TLSv1.2", ssl.TLSVersion.TLSv1_2, ssl.HAS_TLSv1_2),
+    ("TLSv1.3", ssl.TLSVersion.TLSv1_3, ssl.HAS_TLSv1_3),
+]
+LEGACY_PROTOCOLS = ("SSLv3", "TLSv1", "TLSv1.1")
+# Weak cipher families as OpenSSL cipher strings; none of them exist in TLS 1.3
+WEAK_CIPHER_FAMILIES = [
+    ("3DES", "3DES"),
+    ("RC4", "RC4"),
+    ("EXPORT", "EXP"),
+    ("NULL", "eNULL"),
+]
+# CBC suites over SSLv3 (POODLE); SSLv3 only has CBC, RC4 and NULL suites
+CBC_SSL3 = "CBC-SSLv3"
+CBC_SSL3_CIPHERS = "ALL:!RC4:!eNULL"
+ALL_CIPHERS = "ALL:eNULL"
+
+# Server answers to the enumeration: what it accepted, per protocol and per weak family.
+# Values are True/cipher name when accepted, False when refused, None when it could not
+# be offered (untested). probes counts the connections it took; negotiated is the
+# (protocol, cipher) of the first, offer-everything handshake; cached marks a posture
+# reused from the result store after revalidation.
+TLSPosture = namedtuple("TLSPosture", ["protocols", "weak", "probes", "negotiated", "cached"],
+                        defaults=(None, False))
+
+# One audited target: the report columns plus the fields of its structured record
+AuditResult = namedtuple("AuditResult", ["ip", "port", "port_status", "vul_status", "evidence",
+                                         "cipher", "protocol", "latency"])
+
+# "raw": weak-cipher and legacy-protocol checks use hand-built ClientHellos (tls_hello) and
+# work whatever the local OpenSSL supports; "ssl": every check is a full local handshake
+PROBE_ENGINES = ("raw", "ssl")
+PROBE_ENGINE = "raw"
+# Hello versions the raw 3DES check tries, like PROTOCOL_CONTEXTS for the ssl engine
+RAW_3DES_VERSIONS = ("TLSv1.2", "TLSv1")
+
+# Result store for audit results (--db) and how long one stays valid while the
+# certificate and the negotiated protocol/cipher are unchanged
+RESULT_STORE = None
+DEFAULT_CACHE_TTL = "7d"
+CACHE_TTL = parse_duration(DEFAULT_CACHE_TTL)
+
+# Per-host RTT estimates: connects to known hosts time out after a few RTTs, not 3 s
+RTT_TABLE = HostRTTTable(initial=TIMEOUT_SECONDS, minimum=MIN_CONNECT_TIMEOUT, maximum=TIMEOUT_SECONDS)
+LIMITER = RateLimiter(pps=MAX_CONNECTS_PER_SECOND, burst=CONNECT_BURST, subnet_pps=MAX_CONNECTS_PER_SUBNET)
+
 # --- Setup Logging ---
 log_file = f"sweet32_audit_{time.strftime('%Y%m%d_%H%M%S')}.log"
-# Set up logging to output to console and file
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(message)s',
-    handlers=[
-        logging.StreamHandler(sys.stdout),
-        logging.FileHandler(log_file, mode='w')
-    ]
-)
+# Everything logged goes through this queue to one writer thread (see start_logging)
+LOG_QUEUE = queue.Queue()
+# Files are flushed every LOG_BATCH records while results arrive faster than they are written
+LOG_BATCH = 100
+# Fields of the --jsonl/--csv records
+RECORD_FIELDS = ["ip", "port", "status", "cipher", "protocol", "latency"]
+# Coloured table rows go to the console only and their plain copies to the log file only;
+# messages on the root logger go to both, structured records to the --jsonl/--csv files
+CONSOLE_LOG = logging.getLogger("sweet32.console")
+FILE_LOG = logging.getLogger("sweet32.file")
+RECORD_LOG = logging.getLogger("sweet32.records")
+
+class BatchFileHandler(logging.FileHandler):
+    """FileHandler that flushes every LOG_BATCH records (and when told to) instead of per record."""
+
+    def __init__(self, filename, header=None):
+        super().__init__(filename, mode='w')
+        self._unflushed = 0
+        if header:
+            self.stream.write(header + self.terminator)
+
+    def emit(self, record):
+        try:
+            self.stream.write(self.format(record) + self.terminator)
+        except Exception:
+            self.handleError(record)
+            return
+        self._unflushed += 1
+        if self._unflushed >= LOG_BATCH:
+            self.flush()
+
+    def flush(self):
+        self._unflushed = 0
+        super().flush()
+
+class BatchingQueueListener(logging.handlers.QueueListener):
+    """QueueListener that flushes its handlers whenever the queue runs dry, so a batch never
+    waits on the next result, and once more when stopped."""
+
+    def dequeue(self, block):
+        try:
+            return self.queue.get_nowait()
+        except queue.Empty:
+            for handler in self.handlers:
+                handler.flush()
+            return self.queue.get(block)
+
+    def stop(self):
+        super().stop()
+        for handler in self.handlers:
+            handler.flush()
+
+def audit_record(result):
+    """The structured record of an AuditResult, as a dict of RECORD_FIELDS."""
+    status = result.vul_status if result.port_status == "Open" else result.port_status
+    latency = round(result.latency, 6) if result.latency is not None else None
+    return dict(zip(RECORD_FIELDS, (result.ip, result.port, status, result.cipher, result.protocol, latency)))
+
+class JsonlFormatter(logging.Formatter):
+    def format(self, record):
+        return json.dumps(audit_record(record.result))
+
+class CsvFormatter(logging.Formatter):
+    def format(self, record):
+        line = io.StringIO()
+        csv.writer(line, lineterminator="").writerow(audit_record(record.result).values())
+        return line.getvalue()
+
+def _from_loggers(*names):
+    """Handler filter passing only records logged on the named loggers."""
+    return lambda record: record.name in names
+
+def start_logging(jsonl_path=None, csv_path=None):
+    """
+    Sends all logging through LOG_QUEUE to a background writer, so neither the workers nor
+    the reporting loop ever wait on a file write. Returns the started listener; stop() it
+    to drain the queue and flush the files.
+    """
+    console = logging.StreamHandler(sys.stdout)
+    console.addFilter(_from_loggers("root", CONSOLE_LOG.name))
+    log = BatchFileHandler(log_file)
+    log.addFilter(_from_loggers("root", FILE_LOG.name))
+    handlers = [console, log]
+    for path, formatter, header in ((jsonl_path, JsonlFormatter(), None),
+                                    (csv_path, CsvFormatter(), ",".join(RECORD_FIELDS))):
+        if path:
+            handler = BatchFileHandler(path, header)
+            handler.setFormatter(formatter)
+            handler.addFilter(_from_loggers(RECORD_LOG.name))
+            handlers.append(handler)
+    RECORD_LOG.disabled = not (jsonl_path or csv_path)
+
+    root = logging.getLogger()
+    root.setLevel(logging.INFO)
+    root.addHandler(logging.handlers.QueueHandler(LOG_QUEUE))
+    listener = BatchingQueueListener(LOG_QUEUE, *handlers)
+    listener.start()
+    return listener
 
 # Define logger helper functions for color coding and reporting
 def log_terminal(message):
-    """Prints message to console only (including colors)."""
-    print(message, end='')
-    sys.stdout.flush()
+    """Writes message to the console only (including colors)."""
+    CONSOLE_LOG.info(message.rstrip("\n"))
 
 def log_report(ip, port_status, vul_status, cipher_evidence):
     """Logs the final result to both console (with color) and file (without color)."""
@@ -47,52 +216,328 @@ def log_report(ip, port_status, vul_status, cipher_evidence):
         color_code = "\033[0;32m" # Green
     else:
         color_code = "\033[0;33m" # Yellow/Filtered
-        
-    term_output_line = ""
+
+    # Hosts finish out of order, so the whole row is written in one go
+    if port_status == "Open":
+        term_output_line = "%-20s | \033[0;32m%-12s\033[0m | " % (ip, port_status)
+    else:
+        term_output_line = "%-20s | %-12s | " % (ip, port_status)
     if cipher_evidence:
-        term_output_line = f"{color_code}%-30s\033[0m | {color_code}%-30s\033[0m\n" % (vul_status, cipher_evidence)
+        term_output_line += f"{color_code}%-30s\033[0m | {color_code}%-30s\033[0m\n" % (vul_status, cipher_evidence)
     else:
-        term_output_line = f"{color_code}%-30s\033[0m | %-30s\n" % (vul_status, "N/A")
+        term_output_line += f"{color_code}%-30s\033[0m | %-30s\n" % (vul_status, "N/A")
 
     log_terminal(term_output_line)
     
     # 2. File Output (without color)
     file_output = "%-20s | %-12s | %-30s | %-30s" % (ip, port_status, vul_status, cipher_evidence if cipher_evidence else "N/A")
-    logging.info(file_output)
+    FILE_LOG.info(file_output)
     
+def connect_adaptive(sock, ip, port):
+    """
+    Connects with an RTT-derived timeout and records the measured RTT for the host.
+    Returns the connect time in seconds.
+    """
+    LIMITER.wait(ip)
+    sock.settimeout(RTT_TABLE.timeout(ip))
+    start = time.monotonic()
+    try:
+        sock.connect((ip, port))
+    except ConnectionRefusedError:
+        # A refused connect is still a full round trip
+        RTT_TABLE.record(ip, time.monotonic() - start)
+        LIMITER.record(False, sent_at=start)
+        raise
+    except socket.timeout:
+        LIMITER.record(True, sent_at=start)
+        raise
+    elapsed = time.monotonic() - start
+    RTT_TABLE.record(ip, elapsed)
+    LIMITER.record(False, sent_at=start)
+    # The TLS handshake itself gets the full budget
+    sock.settimeout(TIMEOUT_SECONDS)
+    return elapsed
+
 def check_open_port(ip, port):
-    """Performs a fast TCP connection check."""
+    """Performs a fast TCP connection check. Returns the connect time if open, else None."""
     try:
         with closing(socket.socket(socket.AF_INET, socket.SOCK_STREAM)) as sock:
-            sock.settimeout(TIMEOUT_SECONDS)
-            sock.connect((ip, port))
-            return True
+            return connect_adaptive(sock, ip, port)
     except socket.error:
-        return False
+        return None
+
+_PROBE_CONTEXTS = {}
+
+def probe_context(ciphers, minimum, maximum):
+    """
+    Returns the cached client context offering only ciphers between the two versions,
+    building it on first use. None means the local OpenSSL cannot make that offer.
+    """
+    key = (ciphers, minimum, maximum)
+    if key in _PROBE_CONTEXTS:
+        return _PROBE_CONTEXTS[key]
+    context = None
+    try:
+        with warnings.catch_warnings():
+            # Legacy protocol versions are exactly what is being audited
+            warnings.simplefilter("ignore", DeprecationWarning)
+            context = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
+            context.check_hostname = False
+            context.verify_mode = ssl.CERT_NONE
+            context.minimum_version = minimum
+            context.maximum_version = maximum
+            context.set_ciphers(ciphers + ":@SECLEVEL=0")
+        # get_ciphers() always lists the TLS 1.3 suites; the family must have a pre-1.3 member
+        if maximum < ssl.TLSVersion.TLSv1_3 and not any(
+                c["protocol"] != "TLSv1.3" for c in context.get_ciphers()):
+            context = None
+    except (ssl.SSLError, ValueError):
+        context = None
+    _PROBE_CONTEXTS[key] = context
+    return context
+
+def _local_versions():
+    return [(name, version) for name, version, supported in PROTOCOL_VERSIONS if supported]
+
+def build_probe_contexts():
+    """Prebuilds every context the enumeration can ask for, before any worker thread starts."""
+    local = _local_versions()
+    if not local:
+        return
+    lowest, highest = local[0][1], local[-1][1]
+    probe_context(ALL_CIPHERS, lowest, highest)
+    for _, cipher_string in WEAK_CIPHER_FAMILIES:
+        probe_context(cipher_string, lowest, min(highest, ssl.TLSVersion.TLSv1_2))
+    for _, version in local:
+        probe_context(ALL_CIPHERS, version, version)
+    if ssl.HAS_SSLv3:
+        probe_context(CBC_SSL3_CIPHERS, ssl.TLSVersion.SSLv3, ssl.TLSVersion.SSLv3)
+
+def try_handshake(ip, port, context):
+    """
+    One handshake with the given context. Returns (protocol, cipher, certificate DER)
+    if the server accepted it, or None if it refused. Connect failures raise socket.error.
+    """
+    with closing(socket.socket(socket.AF_INET, socket.SOCK_STREAM)) as sock:
+        connect_adaptive(sock, ip, port)
+        try:
+            with context.wrap_socket(sock, server_hostname=ip) as ssl_sock:
+                return ssl_sock.version(), ssl_sock.cipher()[0], ssl_sock.getpeercert(binary_form=True)
+        except (ssl.SSLError, ConnectionResetError, socket.timeout):
+            return None
+
+def raw_probe(ip, port, version_name, family):
+    """
+    One raw ClientHello offering a tls_hello cipher family at up to version_name.
+    Returns (protocol, cipher) if the server picked one, or None if it refused.
+    Connect failures raise socket.error.
+    """
+    with closing(socket.socket(socket.AF_INET, socket.SOCK_STREAM)) as sock:
+        connect_adaptive(sock, ip, port)
+        try:
+            hello = hello_probe(sock, tls_hello.VERSIONS[version_name], CIPHER_FAMILIES[family])
+        except (TLSProbeError, ConnectionResetError, socket.timeout):
+            return None
+    if hello is None or hello.version not in VERSION_NAMES:
+        return None
+    return VERSION_NAMES[hello.version], suite_name(hello.cipher_suite)
+
+def baseline_handshake(ip, port):
+    """The offer-everything handshake: (protocol, cipher, certificate DER), or None if refused."""
+    local = _local_versions()
+    return try_handshake(ip, port, probe_context(ALL_CIPHERS, local[0][1], local[-1][1])) if local else None
+
+def cache_key(baseline):
+    """(certificate SHA-256, config) identifying a server's TLS setup, or None without a store or certificate."""
+    if not (RESULT_STORE and baseline and len(baseline) > 2 and baseline[2]):
+        return None
+    return hashlib.sha256(baseline[2]).hexdigest(), "%s %s" % baseline[:2]
+
+def load_cached(ip, port, key, mode):
+    """The stored result for a cache key if the setup is unchanged and within CACHE_TTL, else None."""
+    row = RESULT_STORE.get_tls_result(ip, port, key[0], mode)
+    if row and row[0] == key[1] and row[2] >= time.time() - CACHE_TTL:
+        return json.loads(row[1])
+    return None
+
+def store_result(ip, port, key, mode, result):
+    RESULT_STORE.put_tls_result(ip, port, key[0], mode, key[1], json.dumps(result))
+
+def enumerate_tls(ip, port):
+    """
+    Determines which protocol versions and weak cipher families the server accepts.
+
+    The plan is ordered so answers are reused: the first handshake offers everything,
+    and the negotiated version shows the server's maximum, so no newer version needs a
+    probe. Each weak-family probe that succeeds also proves its negotiated version, and
+    versions are probed newest first because a server answering an older version than
+    offered settles both. Only versions not known by then get a probe of their own.
+
+    With a result store, the first handshake doubles as revalidation: if the server
+    presents the same certificate and negotiates the same protocol and cipher as when
+    it was last enumerated, within CACHE_TTL, the stored posture is returned instead.
+    """
+    raw = PROBE_ENGINE == "raw"
+    local = _local_versions()
+    names = [name for name, _, _ in PROTOCOL_VERSIONS]
+    protocols = {name: None for name in names}
+    weak = {family: None for family, _ in WEAK_CIPHER_FAMILIES}
+    weak[CBC_SSL3] = None
+    seen_cipher = {}  # protocol -> a cipher the server accepted with it
+    probes = 0
+
+    def record(result):
+        if result:
+            protocols[result[0]] = True
+            seen_cipher.setdefault(result[0], result[1])
+        return result
+
+    def attempt(context):
+        nonlocal probes
+        if context is None:
+            return None
+        probes += 1
+        return record(try_handshake(ip, port, context))
+
+    def attempt_raw(version_name, family):
+        nonlocal probes
+        probes += 1
+        return record(raw_probe(ip, port, version_name, family))
+
+    baseline = attempt(probe_context(ALL_CIPHERS, local[0][1], local[-1][1])) if local else None
+    if baseline is None and raw:
+        # Nothing in common with the local OpenSSL, which may just lack the server's legacy suites
+        if ssl.HAS_TLSv1_3:
+            protocols["TLSv1.3"] = False
+        baseline = attempt_raw("TLSv1.2", "ANY")
+    if baseline is None:
+        # Nothing we can offer is accepted: no TLS here (or nothing in common)
+        for name, version, supported in PROTOCOL_VERSIONS:
+            if protocols[name] is None and (supported or (raw and name in tls_hello.VERSIONS)):
+                protocols[name] = False
+        for family, cipher_string in WEAK_CIPHER_FAMILIES:
+            if raw or probe_context(cipher_string, local[0][1], ssl.TLSVersion.TLSv1_2) is not None:
+                weak[family] = False
+        if raw or ssl.HAS_SSLv3:
+            weak[CBC_SSL3] = False
+        return TLSPosture(protocols, weak, probes)
+    key = cache_key(baseline)
+    saved = key and load_cached(ip, port, key, PROBE_ENGINE)
+    if saved:
+        return TLSPosture(saved["protocols"], saved["weak"], probes, baseline[:2], cached=True)
+
+    for name in names[names.index(baseline[0]) + 1:]:
+        protocols[name] = False
+
+    for family, cipher_string in WEAK_CIPHER_FAMILIES:
+        if raw:
+            result = attempt_raw("TLSv1.2", family)
+        else:
+            context = probe_context(cipher_string, local[0][1], min(local[-1][1], ssl.TLSVersion.TLSv1_2))
+            if context is None:
+                continue
+            result = attempt(context)
+        weak[family] = result[1] if result else False
+
+    for name, version, supported in reversed(PROTOCOL_VERSIONS):
+        if protocols[name] is not None:
+            continue
+        if raw and name in tls_hello.VERSIONS:
+            result = attempt_raw(name, "ANY")
+            # An answer at an older version proves that one and shows this one is refused
+            protocols[name] = bool(result) and result[0] == name
+        elif supported:
+            protocols[name] = attempt(probe_context(ALL_CIPHERS, version, version)) is not None
+
+    if protocols["SSLv3"] is False:
+        weak[CBC_SSL3] = False
+    elif protocols["SSLv3"]:
+        cipher = seen_cipher["SSLv3"]
+        if "RC4" in cipher or "NULL" in cipher:
+            if raw:
+                result = attempt_raw("SSLv3", "CBC")
+            else:
+                result = attempt(probe_context(CBC_SSL3_CIPHERS, ssl.TLSVersion.SSLv3, ssl.TLSVersion.SSLv3))
+            weak[CBC_SSL3] = result[1] if result and result[0] == "SSLv3" else False
+        else:
+            weak[CBC_SSL3] = cipher
+
+    if key:
+        store_result(ip, port, key, PROBE_ENGINE, {"protocols": protocols, "weak": weak})
+    return TLSPosture(protocols, weak, probes, baseline[:2])
+
+def summarize_posture(posture):
+    """Turns a TLSPosture into the (vul_status, cipher_evidence) columns of the report."""
+    accepted = [family for family, cipher in posture.weak.items() if cipher]
+    legacy = [name for name in LEGACY_PROTOCOLS if posture.protocols[name]]
+    if not any(posture.protocols.values()):
+        return "No TLS Handshake", None
+
+    if accepted:
+        status = "VULNERABLE (%s)" % "+".join(accepted)
+    elif legacy:
+        status = "WEAK PROTOCOL (%s)" % "+".join(legacy)
+    else:
+        status = "No Vulnerability Found"
+    evidence = ["%s=%s" % (family, posture.weak[family]) for family in accepted]
+    evidence.append("protocols=" + ",".join(name for name, ok in posture.protocols.items() if ok))
+    untested = [name for name, value in list(posture.weak.items()) + list(posture.protocols.items())
+                if value is None]
+    if untested:
+        evidence.append("untested=" + ",".join(untested))
+    if posture.cached:
+        evidence.append("cached")
+    return status, "; ".join(evidence)
+
+_SWEET32_CONTEXTS = {}
+
+def sweet32_context(protocol):
+    """The 3DES-only context for one of PROTOCOL_CONTEXTS, or None if the local OpenSSL rejects it."""
+    if protocol not in _SWEET32_CONTEXTS:
+        try:
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", DeprecationWarning)
+                context = ssl.SSLContext(protocol)
+            context.set_ciphers(WEAK_3DES_CIPHERS)
+            context.check_hostname = False
+            context.verify_mode = ssl.CERT_NONE
+        except ssl.SSLError:
+            context = None
+        _SWEET32_CONTEXTS[protocol] = context
+    return _SWEET32_CONTEXTS[protocol]
 
 def check_sweet32_vulnerability(ip, port):
     """
     Attempts to establish an SSL/TLS connection using only 3DES across multiple protocols.
-    Returns the negotiated cipher name (string) if vulnerable, or None otherwise.
+    Returns the negotiated (protocol, cipher) if vulnerable, or None otherwise.
     """
+    if PROBE_ENGINE == "raw":
+        # Offering only the 3DES suites in a raw ClientHello does not depend on the local OpenSSL
+        try:
+            for version_name in RAW_3DES_VERSIONS:
+                result = raw_probe(ip, port, version_name, "3DES")
+                if result:
+                    return result
+        except socket.error:
+            pass
+        return None
+
     for protocol in PROTOCOL_CONTEXTS:
         ssl_sock = None
         try:
-            # Create SSL context specific to the protocol version
-            context = ssl.SSLContext(protocol)
-            context.set_ciphers(WEAK_3DES_CIPHERS)
-            context.check_hostname = False
-            context.verify_mode = ssl.CERT_NONE
+            # SSL context specific to the protocol version, built once per process
+            context = sweet32_context(protocol)
+            if context is None:
+                continue
             
             with closing(socket.socket(socket.AF_INET, socket.SOCK_STREAM)) as sock:
-                sock.settimeout(TIMEOUT_SECONDS)
-                sock.connect((ip, port))
+                connect_adaptive(sock, ip, port)
                 ssl_sock = context.wrap_socket(sock, server_hostname=ip)
                 
                 # Success: Vulnerability confirmed!
                 negotiated_cipher = ssl_sock.cipher()
                 if negotiated_cipher:
-                    return negotiated_cipher[0]
+                    return ssl_sock.version(), negotiated_cipher[0]
                 
         except ssl.SSLError:
             continue # Protocol failed, try the next one
@@ -105,68 +550,226 @@ def check_sweet32_vulnerability(ip, port):
     return None # No vulnerability found across all tested protocols
 
 
+def audit_host(ip, port, full_posture=False):
+    """
+    Runs the port check and the 3DES probe (or, with full_posture, the whole
+    enumeration) for one target.
+    Returns an AuditResult; closed ports are never TLS-probed. Its cipher and protocol
+    are those of the accepted 3DES handshake or, with full_posture, of the handshake
+    the server prefers; latency is the TCP connect time.
+    """
+    # 1. SCAN: Check if the port is open
+    latency = check_open_port(ip, port)
+    if latency is None:
+        return AuditResult(ip, port, "Filtered/Closed", "N/A", "N/A", None, None, None)
+
+    if full_posture:
+        try:
+            posture = enumerate_tls(ip, port)
+        except socket.error:
+            return AuditResult(ip, port, "Open", "Connection Lost", "N/A", None, None, latency)
+        vul_status, evidence = summarize_posture(posture)
+        protocol, cipher = posture.negotiated or (None, None)
+        return AuditResult(ip, port, "Open", vul_status, evidence, cipher, protocol, latency)
+
+    # 2. IDENTIFY + ACTION: Run the vulnerability check and extract evidence
+    # With a result store, one ordinary handshake revalidates a stored answer first
+    key = saved = None
+    if RESULT_STORE:
+        try:
+            key = cache_key(baseline_handshake(ip, port))
+        except socket.error:
+            key = None
+        saved = key and load_cached(ip, port, key, "3des-" + PROBE_ENGINE)
+    if saved:
+        negotiated = saved["negotiated"]
+    else:
+        negotiated = check_sweet32_vulnerability(ip, port)
+        if key:
+            store_result(ip, port, key, "3des-" + PROBE_ENGINE, {"negotiated": negotiated})
+    if negotiated:
+        protocol, cipher = negotiated
+        evidence = cipher + ("; cached" if saved else "")
+        return AuditResult(ip, port, "Open", "VULNERABLE (3DES ACCEPTED)", evidence, cipher, protocol, latency)
+    return AuditResult(ip, port, "Open", "No Vulnerability Found", "cached" if saved else "N/A",
+                       None, None, latency)
+
+def read_targets(path):
+    """Yields the IPs in an ip-list file, skipping blanks and comments."""
+    with open(path, 'r') as f:
+        for line in f:
+            ip = line.strip()
+            if ip and not ip.startswith('#'):
+                yield ip
+
+def run_audit(jobs, workers, on_result, full_posture=False):
+    """
+    Audits (ip, port) jobs on a bounded thread pool. Results are collected as they
+    complete but handed to on_result in input order; at most a few results
+    per worker are held back waiting for a slower host ahead of them.
+    """
+    window = workers * REORDER_WINDOW_PER_WORKER
+    in_flight = {}  # future -> input index
+    finished = {}   # input index -> result
+    next_out = 0
+
+    def collect(done):
+        nonlocal next_out
+        for future in done:
+            finished[in_flight.pop(future)] = future.result()
+        while next_out in finished:
+            on_result(finished.pop(next_out))
+            next_out += 1
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        try:
+            for index, (ip, port) in enumerate(jobs):
+                in_flight[pool.submit(audit_host, ip, port, full_posture)] = index
+                while index + 1 - next_out >= window:
+                    collect(wait(in_flight, return_when=FIRST_COMPLETED).done)
+            while in_flight:
+                collect(wait(in_flight, return_when=FIRST_COMPLETED).done)
+        except KeyboardInterrupt:
+            for future in in_flight:
+                future.cancel()
+            raise
+
+def matrix_cell(port_status, vul_status):
+    if port_status != "Open":
+        return "-"
+    if "VULNERABLE" in vul_status:
+        return "VULN"
+    if "WEAK" in vul_status:
+        return "weak"
+    if "No TLS" in vul_status:
+        return "noTLS"
+    return "ok"
+
+def log_matrix(matrix, ports):
+    """Logs the host x port summary; hosts with no open audited port are only counted."""
+    logging.info("\n--- Host x Port Matrix (VULN = weak cipher accepted, weak = legacy protocol, noTLS = open but no TLS, ok = open and not vulnerable, - = closed) ---")
+    logging.info("%-20s" % "IP Address" + "".join("%7s" % port for port in ports))
+    closed_hosts = 0
+    for ip, cells in matrix.items():
+        if all(cell == "-" for cell in cells.values()):
+            closed_hosts += 1
+            continue
+        logging.info("%-20s" % ip + "".join("%7s" % cells.get(port, "?") for port in ports))
+
+    vulnerable = [sum(cells.get(port) == "VULN" for cells in matrix.values()) for port in ports]
+    open_count = [sum(cells.get(port) not in (None, "-") for cells in matrix.values()) for port in ports]
+    logging.info("%-20s" % "Vulnerable/Open" + "".join("%7s" % f"{v}/{o}" for v, o in zip(vulnerable, open_count)))
+    if closed_hosts:
+        logging.info(f"[*] {closed_hosts} host(s) with no open audited port not shown")
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description='Audit hosts for SWEET32 (3DES) cipher support.')
+    parser.add_argument('-i', '--input', default='ip-list.txt',
+                        help='File with target IPs, one per line (default: ip-list.txt)')
+    parser.add_argument('-p', '--port', '--ports', dest='ports',
+                        help="Target port, or ports like '443,8443,993-995' for a host x port matrix "
+                             "(prompted for if omitted)")
+    parser.add_argument('--matrix', action='store_true',
+                        help=f'Non-interactive host x port matrix; without --ports audits {DEFAULT_TLS_PORTS}')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help=f'Hosts audited concurrently (default: {DEFAULT_WORKERS})')
+    add_pacing_arguments(parser, pps=MAX_CONNECTS_PER_SECOND, burst=CONNECT_BURST,
+                         subnet_pps=MAX_CONNECTS_PER_SUBNET)
+    parser.add_argument('--engine', choices=PROBE_ENGINES, default=PROBE_ENGINE,
+                        help='raw: weak-cipher checks send hand-built ClientHellos and work even where the '
+                             'local OpenSSL lacks 3DES/RC4/SSLv3; ssl: full local handshakes (default: raw)')
+    parser.add_argument('--enumerate', action='store_true',
+                        help='Full TLS posture: protocol versions plus 3DES, RC4, export, NULL and '
+                             'CBC-over-SSLv3 support, instead of the 3DES check alone')
+    parser.add_argument('--db', metavar='FILE',
+                        help='SQLite result store; a target whose certificate and negotiated cipher are unchanged '
+                             'since its last audit is only revalidated with one handshake')
+    parser.add_argument('--cache-ttl', type=parse_duration, default=DEFAULT_CACHE_TTL,
+                        help=f'How long a stored result is reused, e.g. 12h, 7d (default: {DEFAULT_CACHE_TTL})')
+    parser.add_argument('--jsonl', metavar='FILE',
+                        help='Also write one JSON record per target (' + ', '.join(RECORD_FIELDS) + ')')
+    parser.add_argument('--csv', metavar='FILE',
+                        help='Also write the same records as CSV with a header row')
+    return parser.parse_args()
+
 def auditor_main():
     """Main function to control the audit process and display results."""
+    args = parse_arguments()
+    listener = start_logging(args.jsonl, args.csv)
+    try:
+        run_auditor(args)
+    finally:
+        # Drains whatever the writer thread has not written yet
+        listener.stop()
+
+def run_auditor(args):
+    global LIMITER, PROBE_ENGINE, RESULT_STORE, CACHE_TTL
+    LIMITER = limiter_from_args(args)
+    PROBE_ENGINE = args.engine
+    CACHE_TTL = args.cache_ttl
     
     logging.info("\n--- Simplified SWEET32 Cipher Auditor (No Scapy/No Sudo Required) ---")
     
     # Check for the required input file
-    if not os.path.exists("ip-list.txt"):
-        print("[CRITICAL ERROR] 'ip-list.txt' not found.")
-        print("Please create this file and populate it with target IP addresses (one per line).")
+    if not os.path.exists(args.input):
+        logging.error(f"[CRITICAL ERROR] '{args.input}' not found.")
+        logging.error("Please create this file and populate it with target IP addresses (one per line).")
         sys.exit(1)
     
-    # User input for the target port
+    # User input for the target port(s)
     try:
-        port_input = input("Please enter the target port number (e.g., 443, 8443): ")
-        target_port = int(port_input)
-        if not 1 <= target_port <= 65535:
-            raise ValueError
+        if args.ports is None and args.matrix:
+            args.ports = DEFAULT_TLS_PORTS
+        if args.ports is None:
+            # The banner must be on screen before the prompt
+            LOG_QUEUE.join()
+            args.ports = input("Please enter the target port number (e.g., 443, 8443): ")
+        ports = parse_port_spec(args.ports)
     except ValueError:
-        print("[ERROR] Invalid port number.")
+        logging.error("[ERROR] Invalid port number.")
         sys.exit(1)
+    matrix_mode = args.matrix or len(ports) > 1
+    matrix = {}
+
+    def report(result):
+        ip = result.ip
+        if matrix_mode:
+            matrix.setdefault(ip, {})[result.port] = matrix_cell(result.port_status, result.vul_status)
+            ip = f"{ip}:{result.port}"
+        log_report(ip, result.port_status, result.vul_status, result.evidence)
+        RECORD_LOG.info("%s:%s", result.ip, result.port, extra={"result": result})
 
     # Output header
     logging.info("-" * 97)
-    print("\n%-20s | %-12s | %-30s | %-30s" % ("IP Address", "Port Status", "Vulnerability Status", "Negotiated Cipher (Evidence)"))
-    print("-" * 97)
+    log_terminal("\n%-20s | %-12s | %-30s | %-30s" % ("IP Address", "Port Status", "Vulnerability Status", "Negotiated Cipher (Evidence)"))
+    log_terminal("-" * 97)
     
     logging.info(f"[*] Audit results will be logged to {log_file}")
 
     try:
-        with open("ip-list.txt", 'r') as f:
-            for line in f:
-                ip = line.strip()
-                if not ip or ip.startswith('#'):
-                    continue
-
-                log_terminal("%-20s | " % ip)
-
-                # 1. SCAN: Check if the port is open
-                if not check_open_port(ip, target_port):
-                    log_report(ip, "Filtered/Closed", "N/A", "N/A")
-                    continue
-                
-                log_terminal("\033[0;32m%-12s\033[0m | " % "Open")
+        # Host-major order keeps each host's rows together in the table and the matrix
+        jobs = ((ip, port) for ip in read_targets(args.input) for port in ports)
+        if args.enumerate or args.db:
+            build_probe_contexts()
+        if args.db:
+            RESULT_STORE = ResultStore(args.db)
+        try:
+            run_audit(jobs, max(1, args.workers), report, args.enumerate)
+        finally:
+            if RESULT_STORE:
+                RESULT_STORE.close()
 
-                # 2. IDENTIFY + ACTION: Run the vulnerability check and extract evidence
-                negotiated_cipher = check_sweet32_vulnerability(ip, target_port)
-                
-                # 3. Report Generation
-                if negotiated_cipher:
-                    log_report(ip, "Open", "VULNERABLE (3DES ACCEPTED)", negotiated_cipher)
-                else:
-                    log_report(ip, "Open", "No Vulnerability Found", "N/A")
-            
-            logging.info("-" * 97)
-            logging.info("[AUDIT COMPLETE] Please review the log file for clean results.")
+        logging.info("-" * 97)
+        if matrix_mode:
+            log_matrix(matrix, ports)
+        logging.info("[AUDIT COMPLETE] Please review the log file for clean results.")
 
 
     except KeyboardInterrupt:
-        print("\n[STOPPED] Audit interrupted by user.")
+        logging.warning("\n[STOPPED] Audit interrupted by user.")
         sys.exit(0)
     except Exception as e:
-        print(f"\n[FATAL ERROR] An unexpected error occurred: {e}")
+        logging.error(f"\n[FATAL ERROR] An unexpected error occurred: {e}")
         sys.exit(1)
 
 